@@ -1,3 +1,4 @@
+import glob, os
 import streamlit as st
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -6,7 +7,17 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from src.utils import load_csv, clean_diabetes
+from src.utils import dataset_path
+from src.filters import RISK_LEVELS
+from src.engine import CohortFilter
+from src.cache import LRUCache
+from src.dataset import DatasetStore, upload_snapshot, snapshot_bytes
+from src.risk import RULE_SETS
+from src.profiling import Profiler, TraceStore, profiling_enabled, is_admin
+from src.charts import HISTOGRAM_HOVER, histogram_data, scatter_traces, LODConfig
+from src.foods import FoodIndex, PRESET_LABELS
+from src.meals import MealPlanner
+from src.themes import THEMES, from_skeleton, get_theme, skeleton, template_name
 
 # ╭─────────────────────────────────────────────╮
 # │ Configuração da página                      │
@@ -18,23 +29,24 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Paleta oficial expandida (tons azuis para diabetes)
+# Instrumentação opcional por rerun (DASHBOARD_PROFILE=1 ou ?profile=1)
+@st.cache_resource
+def load_trace_store():
+    return TraceStore(maxlen=50)
+
+prof = Profiler(profiling_enabled(st.query_params), load_trace_store())
+
+# Paleta oficial (tons azuis para diabetes); as cores dos gráficos Plotly vêm
+# do tema escolhido na sidebar (src.themes)
 core_palette = ["#3674B5", "#578FCA", "#A1E3F9", "#D1F8EF"]
-diabetes_palette = {
-    'primary': '#3674B5',      # Azul principal
-    'secondary': '#578FCA',    # Azul secundário  
-    'light': '#A1E3F9',       # Azul claro
-    'lighter': '#D1F8EF',     # Azul muito claro
-    'dark': '#2563EB',        # Azul escuro
-    'accent': '#1E40AF',      # Azul acentuado
-    'success': '#10B981',     # Verde para dados positivos
-    'warning': '#F59E0B',     # Amarelo para alertas
-    'danger': '#EF4444'       # Vermelho para riscos
-}
+
+# Níveis de detalhe do scatter IMC × Glicose (SVG → WebGL → amostra → densidade)
+scatter_lod = LODConfig(webgl=5_000, sample=100_000, heatmap=1_000_000)
 
 sns.set_palette(core_palette)
 sns.set_style("whitegrid")
 
+prof.lap('css')
 # ╭─────────────────────────────────────────────╮
 # │ CSS Avançado - Design Diabetes Theme        │
 # ╰─────────────────────────────────────────────╯
@@ -514,6 +526,7 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+prof.lap('navbar')
 # ╭─────────────────────────────────────────────╮
 # │ NAVBAR SUPERIOR DIABETES                    │
 # ╰─────────────────────────────────────────────╯
@@ -541,46 +554,77 @@ st.markdown("""
 # ╭─────────────────────────────────────────────╮
 # │ Carregamento dos dados                      │
 # ╰─────────────────────────────────────────────╯
-@st.cache_data
-def load_data():
-    df = clean_diabetes(
-        load_csv(
-            "data/diabetes.csv",
-            "uciml/pima-indians-diabetes-database",
-            "diabetes.csv",
-        )
-    )
-    
-    # Tratar valores nulos antes das classificações
-    df = df.copy()
-    
-    # Adicionar classificações com tratamento de NaN
-    df['Age_Group'] = pd.cut(df['Age'].fillna(df['Age'].median()), 
-                           bins=[0, 30, 45, 60, 100], 
-                           labels=['18-30', '31-45', '46-60', '60+'])
-    
-    df['BMI_Category'] = pd.cut(df['BMI'].fillna(df['BMI'].median()), 
-                              bins=[0, 18.5, 25, 30, float('inf')], 
-                              labels=['Baixo peso', 'Normal', 'Sobrepeso', 'Obesidade'])
-    
-    df['Glucose_Level'] = pd.cut(df['Glucose'].fillna(df['Glucose'].median()), 
-                               bins=[0, 100, 126, float('inf')], 
-                               labels=['Normal', 'Pré-diabetes', 'Diabetes'])
-    
-    # Cálculo do Risk Score com tratamento de NaN
-    df['Risk_Score'] = (
-        (df['Glucose'].fillna(0) > 125).astype(int) * 3 +
-        (df['BMI'].fillna(0) > 30).astype(int) * 2 +
-        (df['Age'].fillna(0) > 45).astype(int) * 1 +
-        (df['BloodPressure'].fillna(0) > 140).astype(int) * 2
-    )
-    
-    return df
+@st.cache_resource
+def load_dataset_store():
+    # Store colunar gerado por `python -m src.ingest` (cohorts maiores que a RAM)
+    # ou diretório/glob com um CSV por clínica (processados em paralelo)
+    path = os.environ.get("DASHBOARD_COHORT_STORE")
+    if not (path and (os.path.exists(path) or glob.glob(path))):
+        path = None
+    # Carga (arquivo local ou mirror offline, sem rede) em segundo plano; depois,
+    # recarrega quando o conteúdo do arquivo muda
+    store = DatasetStore(path, max_entries=2, max_bytes=2 << 30, resolve=lambda: dataset_path(
+        "data/diabetes.csv",
+        "uciml/pima-indians-diabetes-database",
+        "diabetes.csv",
+    ))
+    store.load_async()
+    return store.start_watcher()
+
+@st.cache_resource
+def load_upload_cache():
+    # Uploads manuais: no máximo 4 versões / 1 GiB em memória
+    return LRUCache(maxsize=4, maxbytes=1 << 30, sizeof=snapshot_bytes)
+
+def loading_shell():
+    # Estrutura da página enquanto a primeira carga roda: sidebar e KPIs provisórios
+    with st.sidebar:
+        st.markdown("""
+            <div class="sidebar-header">
+                <div class="sidebar-title">🎛️ Painel de Controle</div>
+                <div class="sidebar-subtitle">Carregando dados…</div>
+            </div>
+        """, unsafe_allow_html=True)
+    for col, (icon, label) in zip(st.columns(5), [
+            ("👥", "Pacientes"), ("🩺", "Taxa Diabetes"), ("🔬", "Glicose Média"),
+            ("⚠️", "Alto Risco"), ("⚖️", "IMC Médio")]):
+        with col:
+            st.markdown(f"""
+                <div class="kpi-card">
+                    <div class="kpi-icon">{icon}</div>
+                    <div class="kpi-value">—</div>
+                    <div class="kpi-label">{label}</div>
+                    <div class="kpi-trend">⏳ Carregando</div>
+                </div>
+            """, unsafe_allow_html=True)
+
+def load_snapshot():
+    store = load_dataset_store()
+    snapshot = store.current(wait=False)
+    if snapshot is not None:
+        return snapshot
+    if store.status == "loading":
+        # A estrutura já foi enviada ao navegador; espera a carga e redesenha
+        loading_shell()
+        with st.spinner("Carregando dados do cohort…"):
+            store.load_async().exception()
+        st.rerun()
+    if not isinstance(store.error, FileNotFoundError):
+        raise store.error
+    up = st.sidebar.file_uploader("📤 Faça upload do CSV", ["csv"])
+    if up:
+        return upload_snapshot(up.getvalue(), up.name, load_upload_cache())
+    st.stop()  # encerra o script se nada foi encontrado
 
 # ╭─────────────────────────────────────────────╮
 # │ SIDEBAR COM FILTROS INTERATIVOS             │
 # ╰─────────────────────────────────────────────╯
-df = load_data()
+prof.lap('carregamento')
+# Snapshot único por rerun: uma recarga em segundo plano não muda os dados no meio da página
+snapshot = load_snapshot()
+engine, memory_report = snapshot.engine, snapshot.memory_report
+df = engine.base
+prof.lap('sidebar')
 with st.sidebar:
     st.markdown("""
         <div class="sidebar-header">
@@ -593,9 +637,8 @@ with st.sidebar:
     st.markdown("### 👥 **Demografia**")
     age_range = st.slider(
         "**Faixa Etária**", 
-        int(df['Age'].min()), 
-        int(df['Age'].max()), 
-        (int(df['Age'].min()), int(df['Age'].max())),
+        *engine.bounds()['Age'],
+        engine.bounds()['Age'],
         help="Selecione a faixa etária para análise"
     )
     
@@ -614,9 +657,8 @@ with st.sidebar:
     
     glucose_range = st.slider(
         "**Nível de Glicose (mg/dL)**",
-        int(df['Glucose'].min()),
-        int(df['Glucose'].max()),
-        (int(df['Glucose'].min()), int(df['Glucose'].max())),
+        *engine.bounds()['Glucose'],
+        engine.bounds()['Glucose'],
         help="Filtrar por níveis de glicose"
     )
     
@@ -629,10 +671,16 @@ with st.sidebar:
     
     risk_level = st.selectbox(
         "**Nível de Risco**",
-        options=['Todos', 'Baixo (0-2)', 'Moderado (3-5)', 'Alto (6-8)'],
+        options=list(RISK_LEVELS),
         help="Filtrar por nível de risco calculado"
     )
     
+    risk_rules = st.selectbox(
+        "**Regras de Risco**",
+        options=list(RULE_SETS),
+        help="Tabela de regras usada no cálculo do Risk Score"
+    )
+    
     st.markdown("---")
     
     # Configurações de visualização
@@ -640,7 +688,7 @@ with st.sidebar:
     
     show_trends = st.checkbox("**Mostrar Tendências**", value=True)
     show_correlations = st.checkbox("**Exibir Correlações**", value=True)
-    chart_theme = st.selectbox("**Tema dos Gráficos**", ['Diabetes Blue', 'Professional', 'High Contrast'])
+    chart_theme = st.selectbox("**Tema dos Gráficos**", list(THEMES))
     
     st.markdown("---")
     
@@ -653,41 +701,42 @@ with st.sidebar:
     st.info(f"""
     **Total de registros:** {len(df)}  
     **Variáveis:** 9 indicadores  
+    **Memória:** {memory_report.after / 2**20:.1f} MB ({memory_report.ratio:.0%} economizado)  
     **Período:** Dados históricos validados  
-    **Última atualização:** Hoje
+    **Versão:** `{snapshot.version[:8]}`  
+    **Última atualização:** {pd.Timestamp(snapshot.loaded_at, unit='s'):%d/%m/%Y %H:%M}
     """)
+    if load_dataset_store().refreshing:
+        st.caption("🔄 Nova versão do dataset sendo carregada; exibindo a atual até terminar.")
 
+prof.lap('filtros')
 # ╭─────────────────────────────────────────────╮
 # │ Aplicar filtros                             │
 # ╰─────────────────────────────────────────────╯
-filtered_df = df[
-    (df['Age'] >= age_range[0]) & 
-    (df['Age'] <= age_range[1]) &
-    (df['Glucose'] >= glucose_range[0]) &
-    (df['Glucose'] <= glucose_range[1]) &
-    (df['BMI_Category'].isin(bmi_categories))
-]
-
-if risk_level != 'Todos':
-    if risk_level == 'Baixo (0-2)':
-        filtered_df = filtered_df[filtered_df['Risk_Score'] <= 2]
-    elif risk_level == 'Moderado (3-5)':
-        filtered_df = filtered_df[(filtered_df['Risk_Score'] >= 3) & (filtered_df['Risk_Score'] <= 5)]
-    elif risk_level == 'Alto (6-8)':
-        filtered_df = filtered_df[filtered_df['Risk_Score'] >= 6]
+df = engine.scored(risk_rules)
+filtered_rows, summary, glucose_hist = engine.query(CohortFilter(
+    age_range,
+    glucose_range,
+    tuple(bmi_categories),
+    risk_level=risk_level,
+    age_groups=tuple(gender_filter),
+    rules=risk_rules,
+))
+prof.count('linhas_filtradas', len(filtered_rows))
 
 # ╭─────────────────────────────────────────────╮
 # │ Container principal                         │
 # ╰─────────────────────────────────────────────╯
 # st.markdown('<div class="main-container">', unsafe_allow_html=True)
 
+prof.lap('kpis')
 # ╭─────────────────────────────────────────────╮
 # │ KPIs PRINCIPAIS                             │
 # ╰─────────────────────────────────────────────╯
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
-    total_patients = len(filtered_df)
+    total_patients = summary.total
     st.markdown(f"""
         <div class="kpi-card">
             <div class="kpi-icon">👥</div>
@@ -698,7 +747,7 @@ with col1:
     """, unsafe_allow_html=True)
 
 with col2:
-    diabetes_rate = (filtered_df['Outcome'].sum() / len(filtered_df) * 100) if len(filtered_df) > 0 else 0
+    diabetes_rate = summary.diabetes_rate
     trend_class = "trend-up" if diabetes_rate < 35 else "trend-down"
     st.markdown(f"""
         <div class="kpi-card">
@@ -710,7 +759,7 @@ with col2:
     """, unsafe_allow_html=True)
 
 with col3:
-    avg_glucose = filtered_df['Glucose'].mean() if len(filtered_df) > 0 else 0
+    avg_glucose = summary.avg_glucose
     glucose_status = "Normal" if avg_glucose < 125 else "Elevada"
     trend_class = "trend-up" if avg_glucose < 125 else "trend-down"
     st.markdown(f"""
@@ -723,8 +772,8 @@ with col3:
     """, unsafe_allow_html=True)
 
 with col4:
-    high_risk = len(filtered_df[filtered_df['Risk_Score'] >= 6]) if len(filtered_df) > 0 else 0
-    risk_percentage = (high_risk / len(filtered_df) * 100) if len(filtered_df) > 0 else 0
+    high_risk = summary.high_risk
+    risk_percentage = summary.risk_percentage
     trend_class = "trend-up" if risk_percentage < 20 else "trend-down"
     st.markdown(f"""
         <div class="kpi-card">
@@ -736,7 +785,7 @@ with col4:
     """, unsafe_allow_html=True)
 
 with col5:
-    avg_bmi = filtered_df['BMI'].mean() if len(filtered_df) > 0 else 0
+    avg_bmi = summary.avg_bmi
     bmi_status = "Normal" if avg_bmi < 25 else "Sobrepeso" if avg_bmi < 30 else "Obesidade"
     trend_class = "trend-up" if avg_bmi < 25 else "trend-down"
     st.markdown(f"""
@@ -751,483 +800,478 @@ with col5:
 # ╭─────────────────────────────────────────────╮
 # │ Tabs principais                             │
 # ╰─────────────────────────────────────────────╯
-tab1, tab2 = st.tabs([
+tab_labels = [
     "📊 Dashboard Principal", 
     "🥗 Análise Nutricional",
-])
+]
+try:
+    # Abas lazy: só a aba aberta executa seu conteúdo
+    tab1, tab2 = st.tabs(tab_labels, key="aba_principal", on_change="rerun")
+except TypeError:
+    # Streamlit sem abas lazy: todas as abas são renderizadas
+    tab1, tab2 = st.tabs(tab_labels)
+
+def tab_open(tab):
+    return getattr(tab, "open", None) is not False
+
+@st.cache_resource
+def chart_skeletons(theme_name):
+    # Esqueletos das figuras da aba principal (template do tema, layout e
+    # estilo dos traces, sem dados): validados uma vez por tema; a cada rerun
+    # só os arrays de dados são preenchidos (src.themes.from_skeleton)
+    theme = get_theme(theme_name)
+    palette, template = theme.palette, template_name(theme_name)
+
+    fig_hist = go.Figure(go.Bar(
+        marker_color=palette['primary'],
+        marker_line_color=theme.background,
+        marker_line_width=2,
+        name="Frequência",
+        opacity=0.8,
+        hovertemplate=HISTOGRAM_HOVER,
+    ), layout=dict(template=template, height=400, bargap=0, showlegend=False,
+                   xaxis_title="Glicose (mg/dL)", yaxis_title="Número de Pacientes"))
+    # Linhas de referência
+    fig_hist.add_vline(x=100, line_dash="dash", line_color=palette['success'],
+                       annotation_text="Normal < 100")
+    fig_hist.add_vline(x=126, line_dash="dash", line_color=palette['danger'],
+                       annotation_text="Diabetes ≥ 126")
+
+    diagnosis = dict(
+        labels=['Não Diabéticos', 'Diabéticos'],
+        hole=0.5,
+        marker_colors=[palette['light'], palette['primary']],
+        textinfo='label+percent+value',
+        textfont_size=12,
+    )
+    legend_below = dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5)
+    fig_pie = go.Figure(go.Pie(**diagnosis, textposition='auto'),
+                        layout=dict(template=template, height=400, showlegend=True,
+                                    legend=legend_below))
+    fig_neighbors = go.Figure(go.Pie(**diagnosis),
+                              layout=dict(template=template, height=320, legend=legend_below,
+                                          margin_t=60))
+
+    fig_scatter = go.Figure(layout=dict(template=template, height=400,
+                                        xaxis_title="IMC (Índice de Massa Corporal)",
+                                        yaxis_title="Glicose (mg/dL)"))
+
+    metrics = ['Glicose', 'IMC', 'Pressão', 'Idade']
+    fig_comparison = go.Figure([
+        go.Bar(name='Não Diabéticos', x=metrics, marker_color=palette['light'],
+               textposition='outside'),
+        go.Bar(name='Diabéticos', x=metrics, marker_color=palette['primary'],
+               textposition='outside'),
+    ], layout=dict(template=template, height=400, barmode='group', yaxis_title='Valor Médio'))
+
+    return {
+        'glucose_hist': skeleton(fig_hist),
+        'diagnosis': skeleton(fig_pie),
+        'neighbors': skeleton(fig_neighbors),
+        'scatter': skeleton(fig_scatter),
+        'comparison': skeleton(fig_comparison),
+    }
+
+theme = get_theme(chart_theme)
+palette = theme.palette
+skeletons = chart_skeletons(chart_theme)
 
 # ╭─────────────────────────────────────────────╮
 # │ TAB 1: Dashboard Principal                  │
 # ╰─────────────────────────────────────────────╯
 with tab1:
-    # Primeira linha de gráficos
-    col1, col2 = st.columns(2)
+    if tab_open(tab1):
+        # Primeira linha de gráficos
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown("""
-            <div class="chart-container">
-                <h3 class="chart-title">
-                    <span class="chart-icon">📊</span>
-                    Distribuição de Glicose
-                </h3>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        fig_hist = go.Figure()
-        fig_hist.add_trace(go.Histogram(
-            x=filtered_df["Glucose"].dropna(),
-            nbinsx=25,
-            marker_color=diabetes_palette['primary'],
-            marker_line_color="white",
-            marker_line_width=2,
-            name="Frequência",
-            opacity=0.8
-        ))
-        
-        # Adicionar linhas de referência
-        fig_hist.add_vline(x=100, line_dash="dash", line_color=diabetes_palette['success'], 
-                          annotation_text="Normal < 100")
-        fig_hist.add_vline(x=126, line_dash="dash", line_color=diabetes_palette['danger'], 
-                          annotation_text="Diabetes ≥ 126")
-        
-        fig_hist.update_layout(
-            title_text="",
-            title_font_size=16,
-            xaxis_title="Glicose (mg/dL)",
-            yaxis_title="Número de Pacientes",
-            height=400,
-            showlegend=False,
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            font=dict(color='#1e293b', size=12),
-            xaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            ),
-            yaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            )
-        )
-
-
+        with col1:
+            prof.lap('grafico.histograma')
+            st.markdown("""
+                <div class="chart-container">
+                    <h3 class="chart-title">
+                        <span class="chart-icon">📊</span>
+                        Distribuição de Glicose
+                    </h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        st.plotly_chart(fig_hist, use_container_width=True)
+            fig_hist = from_skeleton(skeletons['glucose_hist'], [histogram_data(*glucose_hist)])
+            st.plotly_chart(fig_hist, use_container_width=True, theme=None)
     
-    with col2:
-        st.markdown("""
-            <div class="chart-container">
-                <h3 class="chart-title">
-                    <span class="chart-icon">🎯</span>
-                    Distribuição por Diagnóstico
-                </h3>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        diabetes_counts = filtered_df['Outcome'].value_counts()
-        
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=['Não Diabéticos', 'Diabéticos'],
-            values=[diabetes_counts.get(0, 0), diabetes_counts.get(1, 0)],
-            hole=0.5,
-            marker_colors=[diabetes_palette['light'], diabetes_palette['primary']],
-            textinfo='label+percent+value',
-            textposition='auto',
-            textfont_size=12,
-        )])
+        with col2:
+            prof.lap('grafico.pizza')
+            st.markdown("""
+                <div class="chart-container">
+                    <h3 class="chart-title">
+                        <span class="chart-icon">🎯</span>
+                        Distribuição por Diagnóstico
+                    </h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        fig_pie.update_layout(
-            height=400,
-            showlegend=True,
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            font=dict(color='#1e293b', size=12),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.1,
-                xanchor="center",
-                x=0.5,
-                font=dict(color='#1e293b')
-            )
-        )
-
+            diabetes_counts = summary.outcome_counts
         
-        st.plotly_chart(fig_pie, use_container_width=True)
+            fig_pie = from_skeleton(skeletons['diagnosis'], [dict(
+                values=[int(diabetes_counts[0]), int(diabetes_counts[1])])])
+            st.plotly_chart(fig_pie, use_container_width=True, theme=None)
 
-    # Segunda linha de gráficos
-    col1, col2 = st.columns(2)
+        # Segunda linha de gráficos
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown("""
-            <div class="chart-container">
-                <h3 class="chart-title">
-                    <span class="chart-icon">📈</span>
-                    Correlação IMC × Glicose
-                </h3>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        fig_scatter = go.Figure()
-        
-        # Não diabéticos
-        non_diabetic = filtered_df[filtered_df['Outcome'] == 0]
-        fig_scatter.add_trace(go.Scatter(
-            x=non_diabetic['BMI'],
-            y=non_diabetic['Glucose'],
-            mode='markers',
-            name='Não Diabéticos',
-            marker=dict(
-                color=diabetes_palette['light'],
-                size=10,
-                opacity=0.7,
-                line=dict(width=1, color='white')
+        with col1:
+            prof.lap('grafico.scatter')
+            st.markdown("""
+                <div class="chart-container">
+                    <h3 class="chart-title">
+                        <span class="chart-icon">📈</span>
+                        Correlação IMC × Glicose
+                    </h3>
+                </div>
+            """, unsafe_allow_html=True)
+        
+            # Só as colunas do scatter, copiadas direto por grupo de Outcome
+            outcome = df['Outcome'].to_numpy().take(filtered_rows)
+            xy = df.columns.get_indexer(['BMI', 'Glucose'])
+            non_diabetic, diabetic = (df.iloc[filtered_rows[outcome == o], xy] for o in (0, 1))
+            traces = scatter_traces(
+                [non_diabetic, diabetic], 'BMI', 'Glucose',
+                [
+                    # Não diabéticos
+                    dict(name='Não Diabéticos', marker=dict(
+                        color=palette['light'],
+                        size=10,
+                        opacity=0.7,
+                        line=dict(width=1, color=theme.background)
+                    )),
+                    # Diabéticos
+                    dict(name='Diabéticos', marker=dict(
+                        color=palette['primary'],
+                        size=10,
+                        opacity=0.8,
+                        line=dict(width=1, color=theme.background)
+                    )),
+                ],
+                scatter_lod,
             )
-        ))
         
-        # Diabéticos
-        diabetic = filtered_df[filtered_df['Outcome'] == 1]
-        fig_scatter.add_trace(go.Scatter(
-            x=diabetic['BMI'],
-            y=diabetic['Glucose'],
-            mode='markers',
-            name='Diabéticos',
-            marker=dict(
-                color=diabetes_palette['primary'],
-                size=10,
-                opacity=0.8,
-                line=dict(width=1, color='white')
-            )
-        ))
+            # Linha de tendência (estatísticas suficientes já calculadas no resumo)
+            trend = summary.trend
+            if trend.n > 10:
+                x_trend = np.linspace(trend.xmin, trend.xmax, 100)
+            
+                traces.append(go.Scatter(
+                    x=x_trend,
+                    y=trend.predict(x_trend),
+                    mode='lines',
+                    name='Tendência',
+                    line=dict(color=palette['accent'], width=3, dash='dash')
+                ))
+        
+            fig_scatter = from_skeleton(skeletons['scatter'], traces=traces)
+            st.plotly_chart(fig_scatter, use_container_width=True, theme=None)
+    
+        with col2:
+            prof.lap('grafico.comparacao')
+            st.markdown("""
+                <div class="chart-container">
+                    <h3 class="chart-title">
+                        <span class="chart-icon">📊</span>
+                        Análise Comparativa por Grupo
+                    </h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        # Linha de tendência
-        clean_data = filtered_df[['BMI', 'Glucose']].dropna()
-        if len(clean_data) > 10:
-            # Converter para float explicitamente
-            bmi_vals = clean_data['BMI'].astype(float)
-            glucose_vals = clean_data['Glucose'].astype(float)
+            if summary.total > 0:
+                grouped = summary.group_means
             
-            z = np.polyfit(bmi_vals, glucose_vals, 1)
-            p = np.poly1d(z)
-            x_trend = np.linspace(bmi_vals.min(), bmi_vals.max(), 100)
+                columns = ['Glucose', 'BMI', 'BloodPressure', 'Age']
+                fig_comparison = from_skeleton(skeletons['comparison'], [dict(
+                    y=[grouped[g][col] if g in grouped else 0 for col in columns],
+                    text=[f"{grouped[g][col]:.1f}" if g in grouped else "0" for col in columns],
+                ) for g in (0, 1)])
             
-            fig_scatter.add_trace(go.Scatter(
-                x=x_trend,
-                y=p(x_trend),
-                mode='lines',
-                name='Tendência',
-                line=dict(color=diabetes_palette['accent'], width=3, dash='dash')
-            ))
-        
-        fig_scatter.update_layout(
-            xaxis_title="IMC (Índice de Massa Corporal)",
-            yaxis_title="Glicose (mg/dL)",
-            height=400,
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            font=dict(color='#1e293b'),
-            legend=dict(
-                font=dict(color='#1e293b')
-            ),
-             xaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            ),
-            yaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            )
-        )
-        
-        st.plotly_chart(fig_scatter, use_container_width=True)
-    
-    with col2:
+                st.plotly_chart(fig_comparison, use_container_width=True, theme=None)
+
+        # Insights avançados
+        prof.lap('insights')
+        if summary.total > 0:
+            diabetes_rate = summary.diabetes_rate
+            high_glucose_rate = summary.high_glucose_rate
+            obesity_rate = summary.obesity_rate
+            high_risk_count = summary.high_risk
+        
+            # Determinar nível de alerta
+            if diabetes_rate > 40:
+                alert_class = "alert-high"
+                alert_icon = "🚨"
+                alert_level = "CRÍTICO"
+            elif diabetes_rate > 25:
+                alert_class = "alert-medium"
+                alert_icon = "⚠️"
+                alert_level = "MODERADO"
+            else:
+                alert_class = "alert-low"
+                alert_icon = "✅"
+                alert_level = "CONTROLADO"
+        
+            st.markdown(f"""
+                <div class="{alert_class}">
+                    <strong>{alert_icon} NÍVEL DE ALERTA: {alert_level}</strong><br>
+                    Taxa de diabetes atual: {diabetes_rate:.1f}% | Pacientes de alto risco: {high_risk_count}
+                </div>
+            """, unsafe_allow_html=True)
+        
+            # Card de insights detalhados
+            st.markdown(f"""
+                <div class="insight-card">
+                    <h4>🔍 Insights Clínicos Avançados</h4>
+                    <ul class="insight-list">
+                        <li><strong>Prevalência de Diabetes:</strong> {diabetes_rate:.1f}% dos pacientes analisados apresentam diabetes</li>
+                        <li><strong>Hiperglicemia:</strong> {high_glucose_rate:.1f}% têm glicose elevada (>140 mg/dL)</li>
+                        <li><strong>Obesidade:</strong> {obesity_rate:.1f}% dos pacientes estão obesos (IMC >30)</li>
+                        <li><strong>Correlação Crítica:</strong> 78% dos diabéticos têm IMC acima do normal</li>
+                        <li><strong>Fator Idade:</strong> Risco aumenta exponencialmente após os 45 anos</li>
+                        <li><strong>Intervenção Urgente:</strong> {high_risk_count} pacientes precisam de acompanhamento imediato</li>
+                    </ul>
+                </div>
+            """, unsafe_allow_html=True)
+
+        # Pacientes semelhantes (k vizinhos mais próximos no cohort inteiro)
+        prof.lap('vizinhos')
         st.markdown("""
             <div class="chart-container">
                 <h3 class="chart-title">
-                    <span class="chart-icon">📊</span>
-                    Análise Comparativa por Grupo
+                    <span class="chart-icon">👥</span>
+                    Pacientes Semelhantes
                 </h3>
             </div>
         """, unsafe_allow_html=True)
-        
-        if len(filtered_df) > 0:
-            grouped = filtered_df.groupby("Outcome")[["Glucose", "BMI", "BloodPressure", "Age"]].mean()
-            
-            fig_comparison = go.Figure()
-            
-            metrics = ['Glicose', 'IMC', 'Pressão', 'Idade']
-            columns = ['Glucose', 'BMI', 'BloodPressure', 'Age']
-            
-            fig_comparison.add_trace(go.Bar(
-                name='Não Diabéticos',
-                x=metrics,
-                y=[grouped.loc[0, col] if 0 in grouped.index else 0 for col in columns],
-                marker_color=diabetes_palette['light'],
-                text=[f"{grouped.loc[0, col]:.1f}" if 0 in grouped.index else "0" for col in columns],
-                textposition='outside'
-            ))
-            
-            fig_comparison.add_trace(go.Bar(
-                name='Diabéticos',
-                x=metrics,
-                y=[grouped.loc[1, col] if 1 in grouped.index else 0 for col in columns],
-                marker_color=diabetes_palette['primary'],
-                text=[f"{grouped.loc[1, col]:.1f}" if 1 in grouped.index else "0" for col in columns],
-                textposition='outside'
-            ))
-            
-            fig_comparison.update_layout(
-                yaxis_title='Valor Médio',
-                barmode='group',
-                height=400,
-                paper_bgcolor='white',
-                plot_bgcolor='white',
-                font=dict(color='#1e293b'),
-                legend=dict(
-                font=dict(color='#1e293b')
-            ),
-             xaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            ),
-            yaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            )
+
+        neighbor_index = engine.neighbors()
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            patient_pos = int(st.number_input(
+                "Paciente (linha do dataset)", min_value=0, max_value=len(df) - 1,
+                value=int(filtered_rows[0]) if len(filtered_rows) else 0, step=1, key="knn_patient"))
+            n_neighbors = st.slider("Número de vizinhos", 5, 50, 15, key="knn_k")
+            patient = df.iloc[patient_pos]
+            st.dataframe(
+                patient[neighbor_index.columns + ["Outcome"]].rename("Paciente").to_frame(),
+                use_container_width=True,
             )
-            
-            st.plotly_chart(fig_comparison, use_container_width=True)
+        neighbors = neighbor_index.query_patient(patient_pos, n_neighbors)
+        neighbor_df = df.iloc[neighbors.rows].assign(Distancia=neighbors.distances.round(2))
+        with col2:
+            neighbor_outcomes = neighbor_df["Outcome"].value_counts().reindex([0, 1], fill_value=0)
+            fig_neighbors = from_skeleton(
+                skeletons['neighbors'], [dict(values=neighbor_outcomes.tolist())],
+                title=dict(text=f"Diagnóstico dos {len(neighbor_df)} pacientes mais semelhantes"))
+            st.plotly_chart(fig_neighbors, use_container_width=True, theme=None)
+        st.dataframe(
+            neighbor_df[["Distancia"] + neighbor_index.columns + ["Outcome"]],
+            use_container_width=True,
+        )
 
-    # Insights avançados
-    if len(filtered_df) > 0:
-        diabetes_rate = filtered_df['Outcome'].mean() * 100
-        high_glucose_rate = (filtered_df['Glucose'] > 140).mean() * 100
-        obesity_rate = (filtered_df['BMI'] > 30).mean() * 100
-        high_risk_count = len(filtered_df[filtered_df['Risk_Score'] >= 6])
-        
-        # Determinar nível de alerta
-        if diabetes_rate > 40:
-            alert_class = "alert-high"
-            alert_icon = "🚨"
-            alert_level = "CRÍTICO"
-        elif diabetes_rate > 25:
-            alert_class = "alert-medium"
-            alert_icon = "⚠️"
-            alert_level = "MODERADO"
-        else:
-            alert_class = "alert-low"
-            alert_icon = "✅"
-            alert_level = "CONTROLADO"
-        
-        st.markdown(f"""
-            <div class="{alert_class}">
-                <strong>{alert_icon} NÍVEL DE ALERTA: {alert_level}</strong><br>
-                Taxa de diabetes atual: {diabetes_rate:.1f}% | Pacientes de alto risco: {high_risk_count}
-            </div>
-        """, unsafe_allow_html=True)
-        
-        # Card de insights detalhados
-        st.markdown(f"""
-            <div class="insight-card">
-                <h4>🔍 Insights Clínicos Avançados</h4>
-                <ul class="insight-list">
-                    <li><strong>Prevalência de Diabetes:</strong> {diabetes_rate:.1f}% dos pacientes analisados apresentam diabetes</li>
-                    <li><strong>Hiperglicemia:</strong> {high_glucose_rate:.1f}% têm glicose elevada (>140 mg/dL)</li>
-                    <li><strong>Obesidade:</strong> {obesity_rate:.1f}% dos pacientes estão obesos (IMC >30)</li>
-                    <li><strong>Correlação Crítica:</strong> 78% dos diabéticos têm IMC acima do normal</li>
-                    <li><strong>Fator Idade:</strong> Risco aumenta exponencialmente após os 45 anos</li>
-                    <li><strong>Intervenção Urgente:</strong> {high_risk_count} pacientes precisam de acompanhamento imediato</li>
-                </ul>
-            </div>
-        """, unsafe_allow_html=True)
+@st.cache_resource
+def nutrition_figures(theme):
+    # Figuras estáticas da aba nutricional: montadas uma vez por tema e
+    # reutilizadas por todas as sessões (independem dos filtros)
+    alimentos_data = {
+        'Alimento': ['Abacate', 'Espinafre', 'Brócolis', 'Salmão', 'Ovos', 
+                    'Nozes', 'Azeite', 'Quinoa', 'Couve-flor', 'Aspargos'],
+        'IG': [10, 5, 10, 0, 0, 15, 0, 35, 15, 15],
+        'Categoria': ['Gordura Boa', 'Vegetal', 'Vegetal', 'Proteína', 'Proteína',
+                     'Gordura Boa', 'Gordura Boa', 'Carboidrato', 'Vegetal', 'Vegetal']
+    }
+    
+    df_alimentos = pd.DataFrame(alimentos_data)
+    
+    palette, template = get_theme(theme).palette, template_name(theme)
+    fig_foods = px.bar(
+        df_alimentos, 
+        y='Alimento', 
+        x='IG',
+        color='Categoria',
+        orientation='h',
+        template=template,
+        color_discrete_map={
+            'Proteína': palette['primary'],
+            'Vegetal': palette['success'],
+            'Gordura Boa': palette['light'],
+            'Carboidrato': palette['secondary']
+        }
+    )
+    fig_foods.update_layout(xaxis_title='Índice Glicêmico', height=450)
+    
+    # Duas opções: dieta padrão vs dieta para diabetes
+    macro_comparison = pd.DataFrame({
+        'Macronutriente': ['Carboidratos', 'Proteínas', 'Gorduras'] * 2,
+        'Percentual': [45, 20, 35, 30, 30, 40],
+        'Tipo': ['Dieta Padrão', 'Dieta Padrão', 'Dieta Padrão',
+                'Dieta Diabetes', 'Dieta Diabetes', 'Dieta Diabetes']
+    })
+    
+    fig_macro = px.bar(
+        macro_comparison,
+        x='Macronutriente',
+        y='Percentual',
+        color='Tipo',
+        barmode='group',
+        template=template,
+        color_discrete_map={
+            'Dieta Padrão': palette['light'],
+            'Dieta Diabetes': palette['primary']
+        }
+    )
+    fig_macro.update_layout(yaxis_title='Percentual (%)', height=450)
+    
+    return fig_foods, fig_macro
+
+@st.cache_resource
+def load_food_index():
+    # Base de alimentos tipada e indexada, compartilhada entre sessões
+    return FoodIndex.load(dataset_path("data/pred_food.csv") or "data/pred_food.csv")
+
+@st.cache_resource
+def load_meal_planner():
+    return MealPlanner(load_food_index())
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def meal_plan(daily_kcal):
+    return load_meal_planner().plan(daily_kcal)
 
+prof.lap('aba.nutricional')
 # ╭─────────────────────────────────────────────╮
 # │ TAB 2: Análise Nutricional                 │
 # ╰─────────────────────────────────────────────╯
 with tab2:
-    st.markdown("### 🥗 Orientações Nutricionais Personalizadas para Diabetes")
+    if tab_open(tab2):
+        fig_foods, fig_macro = nutrition_figures(chart_theme)
+        
+        st.markdown("### 🥗 Orientações Nutricionais Personalizadas para Diabetes")
     
-    col1, col2 = st.columns(2)
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown("""
-            <div class="chart-container">
-                <h3 class="chart-title">
-                    <span class="chart-icon">🍎</span>
-                    Alimentos Recomendados (Baixo IG)
-                </h3>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        alimentos_data = {
-            'Alimento': ['Abacate', 'Espinafre', 'Brócolis', 'Salmão', 'Ovos', 
-                        'Nozes', 'Azeite', 'Quinoa', 'Couve-flor', 'Aspargos'],
-            'IG': [10, 5, 10, 0, 0, 15, 0, 35, 15, 15],
-            'Categoria': ['Gordura Boa', 'Vegetal', 'Vegetal', 'Proteína', 'Proteína',
-                         'Gordura Boa', 'Gordura Boa', 'Carboidrato', 'Vegetal', 'Vegetal']
-        }
-        
-        df_alimentos = pd.DataFrame(alimentos_data)
-        
-        fig_foods = px.bar(
-            df_alimentos, 
-            y='Alimento', 
-            x='IG',
-            color='Categoria',
-            orientation='h',
-            color_discrete_map={
-                'Proteína': diabetes_palette['primary'],
-                'Vegetal': diabetes_palette['success'],
-                'Gordura Boa': diabetes_palette['light'],
-                'Carboidrato': diabetes_palette['secondary']
-            }
-        )
+        with col1:
+            st.markdown("""
+                <div class="chart-container">
+                    <h3 class="chart-title">
+                        <span class="chart-icon">🍎</span>
+                        Alimentos Recomendados (Baixo IG)
+                    </h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        fig_foods.update_layout(
-            xaxis_title='Índice Glicêmico',
-            height=450,
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            font=dict(color='#1e293b'),
-            legend=dict(
-                title_font=dict(color='#1e293b'),
-                font=dict(color='#1e293b')
-            ),
-             xaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            ),
-            yaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            )
-        )
+            st.plotly_chart(fig_foods, use_container_width=True, theme=None)
+    
+        with col2:
+            st.markdown("""
+                <div class="chart-container">
+                    <h3 class="chart-title">
+                        <span class="chart-icon">📊</span>
+                        Distribuição Ideal de Macronutrientes
+                    </h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        st.plotly_chart(fig_foods, use_container_width=True)
+            st.plotly_chart(fig_macro, use_container_width=True, theme=None)
     
-    with col2:
+        # Planos alimentares gerados da base de alimentos (meta 30/30/40, menor carga glicêmica)
+        daily_kcal = st.slider("Meta calórica das refeições principais (kcal/dia)", 900, 2400, 1150,
+                               step=50, key="plan_kcal")
+        plan_items, plan_totals = meal_plan(daily_kcal)
+        meal_icons = {"Café da manhã": "🥬", "Almoço": "🍽️", "Jantar": "🌙"}
+        for col, (_, meal) in zip(st.columns(3), plan_totals.iterrows()):
+            foods_html = "".join(
+                f"<li>{row['Food Name']} ({row['Calories']} kcal)</li>"
+                for _, row in plan_items[plan_items["meal"] == meal["meal"]].iterrows())
+            with col:
+                st.markdown(f"""
+                    <div class="insight-card">
+                        <h4>{meal_icons.get(meal['meal'], '🍴')} {meal['meal'].upper()}</h4>
+                        <ul class="insight-list">{foods_html}</ul>
+                        <div style="text-align: center; margin-top: 1rem;">
+                            <strong>🔥 ~{meal['kcal']:.0f} kcal | CG {meal['glycemic_load']:.1f}</strong><br>
+                            <small>C {meal['carbs_pct']:.0f}% • P {meal['protein_pct']:.0f}% • G {meal['fat_pct']:.0f}%</small>
+                        </div>
+                    </div>
+                """, unsafe_allow_html=True)
+        prof.lap('aba.plano')
+
+        # Explorador da base de alimentos (consultas pelo índice ordenado)
         st.markdown("""
             <div class="chart-container">
                 <h3 class="chart-title">
-                    <span class="chart-icon">📊</span>
-                    Distribuição Ideal de Macronutrientes
+                    <span class="chart-icon">🔎</span>
+                    Explorador de Alimentos
                 </h3>
             </div>
         """, unsafe_allow_html=True)
-        
-        # Duas opções: dieta padrão vs dieta para diabetes
-        macro_comparison = pd.DataFrame({
-            'Macronutriente': ['Carboidratos', 'Proteínas', 'Gorduras'] * 2,
-            'Percentual': [45, 20, 35, 30, 30, 40],
-            'Tipo': ['Dieta Padrão', 'Dieta Padrão', 'Dieta Padrão',
-                    'Dieta Diabetes', 'Dieta Diabetes', 'Dieta Diabetes']
-        })
-        
-        fig_macro = px.bar(
-            macro_comparison,
-            x='Macronutriente',
-            y='Percentual',
-            color='Tipo',
-            barmode='group',
-            color_discrete_map={
-                'Dieta Padrão': diabetes_palette['light'],
-                'Dieta Diabetes': diabetes_palette['primary']
-            }
-        )
-        
-        fig_macro.update_layout(
-            yaxis_title='Percentual (%)',
-            height=450,
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            font=dict(color='#1e293b'),
-            legend=dict(
-                title_font=dict(color='#1e293b'),
-                font=dict(color='#1e293b')
-            ),
-             xaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            ),
-            yaxis=dict(
-                title_font=dict(color='#1e293b'),
-                tickfont=dict(color='#1e293b')
-            )
+
+        foods = load_food_index()
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            food_presets = st.multiselect(
+                "Critérios", options=list(PRESET_LABELS), default=["low_gi"],
+                format_func=PRESET_LABELS.get, key="food_presets")
+        with col2:
+            food_flags = [name for name, label in (("diabetes", "Adequado para diabetes"),
+                                                   ("blood_pressure", "Adequado para pressão"))
+                          if st.checkbox(label, value=name == "diabetes", key=f"food_{name}")]
+        with col3:
+            food_sort = st.selectbox("Ordenar por", ["Glycemic Load", "Glycemic Index", "Calories",
+                                                     "Sodium Content", "Fiber Content"], key="food_sort")
+        food_results = foods.query(flags=food_flags, presets=food_presets, sort_by=food_sort)
+        st.caption(f"{len(food_results)} de {foods.n} alimentos")
+        st.dataframe(
+            food_results[["Food Name", "Glycemic Index", "Glycemic Load", "Calories",
+                          "Carbohydrates", "Protein", "Fat", "Percentual_Proteina",
+                          "Fiber Content", "Sodium Content"]].round(1),
+            use_container_width=True, hide_index=True, height=320,
         )
-        
-        st.plotly_chart(fig_macro, use_container_width=True)
-    
-    # Planos alimentares
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-            <div class="insight-card">
-                <h4>🥬 CAFÉ DA MANHÃ</h4>
-                <ul class="insight-list">
-                    <li>2 ovos mexidos com espinafre</li>
-                    <li>1 fatia de abacate</li>
-                    <li>Chá verde sem açúcar</li>
-                    <li>30g de nozes</li>
-                </ul>
-                <div style="text-align: center; margin-top: 1rem;">
-                    <strong>🔥 ~320 kcal | IG Baixo</strong>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-            <div class="insight-card">
-                <h4>🍽️ ALMOÇO</h4>
-                <ul class="insight-list">
-                    <li>150g salmão grelhado</li>
-                    <li>Salada de folhas verdes</li>
-                    <li>Brócolis no vapor</li>
-                    <li>1 col. sopa azeite</li>
-                </ul>
-                <div style="text-align: center; margin-top: 1rem;">
-                    <strong>🔥 ~450 kcal | IG Baixo</strong>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
+        prof.lap('aba.alimentos')
+
+        # Dicas importantes
         st.markdown("""
-            <div class="insight-card">
-                <h4>🌙 JANTAR</h4>
-                <ul class="insight-list">
-                    <li>120g peito de frango</li>
-                    <li>Couve-flor refogada</li>
-                    <li>Salada colorida</li>
-                    <li>Chá de camomila</li>
-                </ul>
-                <div style="text-align: center; margin-top: 1rem;">
-                    <strong>🔥 ~380 kcal | IG Baixo</strong>
+            <div class="alert-medium">
+                <h4>💡 DICAS IMPORTANTES PARA CONTROLE GLICÊMICO</h4>
+                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 2rem; margin-top: 1rem;">
+                    <div>
+                        <strong>✅ FAÇA:</strong><br>
+                        • Coma de 3 em 3 horas<br>
+                        • Priorize fibras e proteínas<br>
+                        • Beba 2-3L de água/dia<br>
+                        • Pratique exercícios regularmente
+                    </div>
+                    <div>
+                        <strong>❌ EVITE:</strong><br>
+                        • Açúcares refinados<br>
+                        • Alimentos processados<br>
+                        • Jejum prolongado<br>
+                        • Bebidas açucaradas
+                    </div>
                 </div>
             </div>
         """, unsafe_allow_html=True)
-    
-    # Dicas importantes
-    st.markdown("""
-        <div class="alert-medium">
-            <h4>💡 DICAS IMPORTANTES PARA CONTROLE GLICÊMICO</h4>
-            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 2rem; margin-top: 1rem;">
-                <div>
-                    <strong>✅ FAÇA:</strong><br>
-                    • Coma de 3 em 3 horas<br>
-                    • Priorize fibras e proteínas<br>
-                    • Beba 2-3L de água/dia<br>
-                    • Pratique exercícios regularmente
-                </div>
-                <div>
-                    <strong>❌ EVITE:</strong><br>
-                    • Açúcares refinados<br>
-                    • Alimentos processados<br>
-                    • Jejum prolongado<br>
-                    • Bebidas açucaradas
-                </div>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+
+# ╭─────────────────────────────────────────────╮
+# │ Painel de profiling (somente admin)         │
+# ╰─────────────────────────────────────────────╯
+prof.finish()
+if is_admin(st.query_params):
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### ⏱️ **Profiling**")
+        traces = prof.store.recent(10)
+        if traces:
+            st.dataframe(
+                pd.DataFrame([{**t['sections_ms'], 'total': t['total_ms'], **t['counters']} for t in traces])
+                .iloc[::-1].round(1),
+                use_container_width=True,
+            )
+            st.caption(f"Cache de recortes: {engine.cache.stats()}")
+        else:
+            st.caption("Ative com `?profile=1` ou `DASHBOARD_PROFILE=1`.")
+        trace_file = os.environ.get("DASHBOARD_TRACE_FILE", "profiling/traces.jsonl")
+        if st.button("💾 Exportar traces", use_container_width=True):
+            st.success(f"{prof.store.export(trace_file)} reruns gravados em {trace_file}")
@@ -0,0 +1,142 @@
+"""API HTTP/JSON local com as métricas do cohort, sem sessão do Streamlit.
+
+Uso::
+
+    python -m src.api --data data/diabetes.csv --port 8502
+
+Rotas (GET):
+
+- ``/v1/meta``  — versão do dataset, limites dos filtros, categorias e regras;
+- ``/v1/stats`` — resumo do recorte. Parâmetros (todos opcionais): ``age_min``,
+  ``age_max``, ``glucose_min``, ``glucose_max``, ``bmi`` e ``age_group``
+  (repetíveis), ``risk`` e ``rules``;
+- ``/health``.
+
+As respostas levam ``ETag`` derivado da versão do dataset e dos filtros
+normalizados; ``If-None-Match`` devolve 304 sem recalcular nada. O dataset vem
+de um ``DatasetStore`` com watcher: quando o arquivo muda, a versão (e o ETag)
+muda junto, como no dashboard.
+"""
+import argparse, hashlib, json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.cache import LRUCache
+from src.dataset import DatasetStore
+from src.engine import CohortEngine, result_payload
+from src.filters import RISK_LEVELS
+from src.risk import DEFAULT_RULES, RULE_SETS
+
+
+def parse_filter(engine: CohortEngine, qs: dict):
+    """Query string → ``CohortFilter`` (parâmetros ausentes = sem filtro)."""
+    b = engine.bounds()
+    one = lambda name, default: qs[name][-1] if name in qs else default
+    overrides = {
+        "age_range": (int(one("age_min", b["Age"][0])), int(one("age_max", b["Age"][1]))),
+        "glucose_range": (int(one("glucose_min", b["Glucose"][0])),
+                          int(one("glucose_max", b["Glucose"][1]))),
+        "risk_level": one("risk", "Todos"),
+        "rules": one("rules", DEFAULT_RULES.key),
+    }
+    if "bmi" in qs:
+        overrides["bmi_categories"] = tuple(qs["bmi"])
+    if "age_group" in qs:
+        overrides["age_groups"] = tuple(qs["age_group"])
+    if overrides["risk_level"] not in RISK_LEVELS:
+        raise ValueError(f"risk inválido: {overrides['risk_level']}")
+    if overrides["rules"] not in RULE_SETS:
+        raise ValueError(f"rules inválido: {overrides['rules']}")
+    return engine.default_filter(**overrides)
+
+
+class StatsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store: DatasetStore, cache_size: int = 1024):
+        super().__init__(address, StatsHandler)
+        self.store = store
+        self.responses = LRUCache(maxsize=cache_size)   # (versão, chave) → (etag, corpo)
+
+    def respond(self, engine: CohortEngine, key, build) -> tuple:
+        def render():
+            body = json.dumps(build(), ensure_ascii=False, separators=(",", ":")).encode()
+            etag = hashlib.blake2b(repr((engine.version, key)).encode(),
+                                   digest_size=12).hexdigest()
+            return f'"{etag}"', body
+        return self.responses.get_or_compute((engine.version, key), render)
+
+
+class StatsHandler(BaseHTTPRequestHandler):
+    server: StatsServer
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        engine = self.server.store.current().engine   # uma versão por requisição
+        try:
+            qs = parse_qs(url.query)
+            if url.path == "/health":
+                return self._send(200, b'{"status":"ok"}')
+            if url.path == "/v1/meta":
+                etag, body = self.server.respond(engine, ("meta",), lambda: {
+                    "version": engine.version,
+                    "rows": len(engine.base),
+                    "bounds": engine.bounds(),
+                    "bmi_categories": list(engine.base["BMI_Category"].cat.categories),
+                    "age_groups": list(engine.base["Age_Group"].cat.categories),
+                    "risk_levels": list(RISK_LEVELS),
+                    "rules": list(RULE_SETS),
+                })
+            elif url.path == "/v1/stats":
+                f = parse_filter(engine, qs)
+                etag, body = self.server.respond(engine, ("stats", f.key), lambda: {
+                    "version": engine.version,
+                    "filter": f.key,
+                    "stats": result_payload(engine.query(f)),
+                })
+            else:
+                return self._send(404, b'{"error":"not found"}')
+        except (ValueError, KeyError) as e:
+            return self._send(400, json.dumps({"error": str(e)}, ensure_ascii=False).encode())
+
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", etag)
+        self._send(200, body, etag)
+
+    def _send(self, status: int, body: bytes, etag: str | None = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")   # revalida sempre via ETag
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, fmt, *args):   # silencioso: alta taxa de requisições
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API local de métricas do cohort")
+    parser.add_argument("--data", default="data/diabetes.csv",
+                        help="CSV, diretório/glob de CSVs ou store Parquet de src.ingest")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="segundos entre verificações de mudança do dataset")
+    args = parser.parse_args(argv)
+    store = DatasetStore(args.data, interval=args.interval)
+    version = store.current().version   # carga inicial antes de aceitar conexões
+    server = StatsServer((args.host, args.port), store.start_watcher())
+    print(f"API em http://{args.host}:{args.port} (dataset {version})")
+    try:
+        server.serve_forever()
+    finally:
+        store.stop()
+
+
+if __name__ == "__main__":
+    main()
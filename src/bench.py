@@ -0,0 +1,187 @@
+"""Benchmark do pipeline do dashboard com cohorts sintéticos no esquema Pima.
+
+Uso::
+
+    python -m src.bench --rows 1k 100k 1M --repeat 3 --out bench.json
+
+Cada tamanho roda num processo novo (o pico de RSS não vaza entre tamanhos);
+o JSON traz o commit atual para comparar resultados entre versões. Por etapa,
+``alloc_peak_mb`` é o pico alocado por ela (``tracemalloc``, numa execução
+extra fora da cronometragem: cobre Python e numpy, não buffers do Arrow) e
+``process_peak_rss_mb`` o pico do processo até ali (``ru_maxrss``, só cresce).
+"""
+import argparse, json, os, platform, resource, subprocess, tempfile, time, tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np, pandas as pd
+
+PIMA_COLUMNS = ["Pregnancies", "Glucose", "BloodPressure", "SkinThickness", "Insulin",
+                "BMI", "DiabetesPedigreeFunction", "Age", "Outcome"]
+
+
+def parse_rows(text: str) -> int:
+    """``"1k"`` → 1000, ``"50M"`` → 50_000_000."""
+    mult = {"k": 10**3, "m": 10**6}.get(text[-1].lower(), 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def synthetic_cohort(n: int, seed: int = 0) -> pd.DataFrame:
+    """Cohort sintético com distribuições próximas às do Pima (inclui os zeros
+    que ``clean_diabetes`` trata como ausentes)."""
+    rng = np.random.default_rng(seed)
+    outcome = (rng.random(n) < 0.35).astype("int8")
+
+    def measure(mean, sd, lo, hi, zero_rate, shift=0.0, decimals=0):
+        # deslocamento em float: em int8, 110 + 31 estoura para -115
+        mean = mean + shift * outcome.astype(np.float64)
+        v = np.clip(rng.normal(mean, sd, n), lo, hi).round(decimals)
+        v[rng.random(n) < zero_rate] = 0
+        return v if decimals else v.astype("int16")
+
+    return pd.DataFrame({
+        "Pregnancies": rng.poisson(3.8, n).clip(0, 17).astype("int8"),
+        "Glucose": measure(110, 26, 44, 199, 0.007, shift=31),
+        "BloodPressure": measure(70, 12, 24, 122, 0.046, shift=3),
+        "SkinThickness": measure(29, 10, 7, 99, 0.296),
+        "Insulin": measure(155, 118, 14, 846, 0.487),
+        "BMI": measure(31, 7, 18.2, 67.1, 0.014, shift=3.5, decimals=1),
+        "DiabetesPedigreeFunction": rng.gamma(2.0, 0.24, n).clip(0.078, 2.42).round(3),
+        "Age": (21 + rng.gamma(1.6, 7.5, n)).clip(21, 81).astype("int8"),
+        "Outcome": outcome,
+    })[PIMA_COLUMNS]
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Linux: KiB
+
+
+def _alloc_peak_mb(fn) -> float:
+    """Pico de memória alocada durante ``fn()`` (além do que já existia)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _run_size(n: int, repeat: int, seed: int) -> list:
+    # Importados aqui: o processo filho mede o próprio pico de memória
+    import plotly.graph_objects as go
+    from src.utils import read_table, clean_diabetes, derive_columns, compact_dtypes
+    from src.filters import FilterIndex
+    from src.metrics import GROUP_COLUMNS, summarize, histogram
+    from src.charts import HISTOGRAM_HOVER, histogram_bar, histogram_data, scatter_traces
+    from src.themes import DEFAULT_THEME, from_skeleton, skeleton, template_name
+
+    results = []
+
+    def stage(name, fn, warm=None):
+        times = []
+        for _ in range(repeat):
+            if warm:
+                warm()
+            t0 = time.perf_counter()
+            value = fn()
+            times.append(time.perf_counter() - t0)
+        if warm:
+            warm()
+        results.append({"rows": n, "stage": name, "seconds": min(times),
+                        "mean_seconds": sum(times) / len(times),
+                        "alloc_peak_mb": round(_alloc_peak_mb(fn), 1),
+                        "process_peak_rss_mb": round(_peak_rss_mb(), 1)})
+        return value
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, "cohort.csv")
+        synthetic_cohort(n, seed).to_csv(csv, index=False)
+
+        def drop_sidecars():
+            cache = os.path.join(tmp, ".columnar")
+            for f in os.listdir(cache) if os.path.isdir(cache) else []:
+                os.remove(os.path.join(cache, f))
+
+        raw = stage("load_csv.read_csv", lambda: read_table(csv, columnar=False))
+        stage("load_csv.columnar_cold", lambda: read_table(csv), warm=drop_sidecars)
+        stage("load_csv.columnar_warm", lambda: read_table(csv))
+        clean = stage("clean_diabetes", lambda: clean_diabetes(raw))
+        del raw   # cada etapa libera a anterior: o RSS reflete só o que segue vivo
+        derived = stage("derive_columns", lambda: derive_columns(clean))
+        del clean
+        df = stage("compact_dtypes", lambda: compact_dtypes(derived)[0])
+        del derived
+        index = stage("filter_index.build", lambda: FilterIndex(df))
+        cats = ["Baixo peso", "Normal", "Sobrepeso", "Obesidade"]
+        rows = stage("filter_index.query", lambda: index.query(
+            (30, 60), (90, 160), cats[1:], ["31-45", "46-60"], "Moderado (3-5)"))
+        stage("filter.pandas_masks", lambda: df[
+            (df["Age"] >= 30) & (df["Age"] <= 60) & (df["Glucose"] >= 90)
+            & (df["Glucose"] <= 160) & df["BMI_Category"].isin(cats[1:])
+            & df["Age_Group"].isin(["31-45", "46-60"])
+            & (df["Risk_Score"] >= 3) & (df["Risk_Score"] <= 5)])
+        cohort = df.iloc[rows]
+        stats = stage("summarize", lambda: summarize(cohort))
+        stage("summarize.pandas", lambda: (   # varreduras separadas, como antes do summarize
+            cohort["Outcome"].sum(), cohort["Glucose"].mean(), cohort["BMI"].mean(),
+            (cohort["Risk_Score"] >= 6).sum(), (cohort["Glucose"] > 140).mean(),
+            (cohort["BMI"] > 30).mean(), cohort["Outcome"].value_counts(),
+            cohort.groupby("Outcome")[GROUP_COLUMNS].mean()))
+        hist = stage("histogram", lambda: histogram(cohort["Glucose"], 25, (90, 160)))
+        stage("figure.histogram", lambda: go.Figure(histogram_bar(*hist)).to_json())
+        hist_skeleton = skeleton(go.Figure(go.Bar(hovertemplate=HISTOGRAM_HOVER),
+                                           layout=dict(template=template_name(DEFAULT_THEME))))
+        stage("figure.histogram_skeleton", lambda: from_skeleton(
+            hist_skeleton, [histogram_data(*hist)]).to_json())
+        groups = [cohort[cohort["Outcome"] == 0], cohort[cohort["Outcome"] == 1]]
+        styles = [dict(name="Não Diabéticos", marker=dict(color="#A1E3F9")),
+                  dict(name="Diabéticos", marker=dict(color="#3674B5"))]
+        stage("figure.scatter", lambda: go.Figure(
+            scatter_traces(groups, "BMI", "Glucose", styles)).to_json())
+        stage("figure.trend", lambda: stats.trend.predict(
+            np.linspace(stats.trend.xmin, stats.trend.xmax, 100)))
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline do dashboard")
+    parser.add_argument("--rows", nargs="+", default=["1k", "10k", "100k", "1M"],
+                        help="tamanhos dos cohorts (ex.: 1k 100k 1M 50M)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in map(parse_rows, args.rows):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results += pool.submit(_run_size, n, args.repeat, args.seed).result()
+        print(f"{n:>12,} linhas concluídas (pico RSS do processo {results[-1]['process_peak_rss_mb']} MB)")
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    for r in results:
+        print(f"{r['rows']:>12,}  {r['stage']:<26} {r['seconds'] * 1000:>10.2f} ms"
+              f" {r['alloc_peak_mb']:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
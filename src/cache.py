@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Cache LRU limitado, seguro entre threads (sessões do Streamlit).
+
+    ``get_or_compute`` devolve o valor da chave ou o calcula, contabilizando
+    acertos/faltas em ``hits``/``misses``. Além de ``maxsize`` entradas, o cache
+    pode ser limitado a ``maxbytes`` segundo ``sizeof(valor)``; a entrada mais
+    recente é sempre mantida, mesmo que sozinha passe do limite.
+    """
+
+    def __init__(self, maxsize: int = 64, maxbytes: int | None = None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = self.misses = 0
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        value = compute()   # fora do lock: cálculos de chaves distintas não se bloqueiam
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._sizes[key]
+            self._data[key], self._sizes[key] = value, size
+            self._data.move_to_end(key)
+            self.nbytes += size
+            while len(self._data) > 1 and (
+                    len(self._data) > self.maxsize
+                    or (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+                old, _ = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(old)
+
+    def put(self, key, value):
+        """Grava ``value`` sem contar acerto/falta (ex.: recorte atualizado por append)."""
+        self._store(key, value)
+        return value
+
+    def items(self) -> list:
+        """Entradas atuais, da menos para a mais recentemente usada."""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.nbytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+
+import numpy as np
+import plotly.graph_objects as go
+
+
+HISTOGRAM_HOVER = "%{customdata[0]:.0f} – %{customdata[1]:.0f}: %{y}<extra></extra>"
+
+
+def histogram_data(counts, edges) -> dict:
+    """Arrays do histograma pré-agregado: centro, altura, largura e limites de cada faixa."""
+    edges = np.asarray(edges, dtype="float64")
+    return dict(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=np.asarray(counts),
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+    )
+
+
+def histogram_bar(counts, edges, **kwargs) -> go.Bar:
+    """Histograma pré-agregado: uma barra por faixa, com largura da faixa."""
+    return go.Bar(**histogram_data(counts, edges), hovertemplate=HISTOGRAM_HOVER, **kwargs)
+
+
+@dataclass(frozen=True)
+class LODConfig:
+    """Limites (em pontos filtrados) para o nível de detalhe do scatter.
+
+    - até ``webgl``: ``go.Scatter`` (SVG) com todos os pontos;
+    - até ``sample``: ``go.Scattergl`` (WebGL) com todos os pontos;
+    - até ``heatmap``: ``Scattergl`` com amostra estratificada por ``Outcome``
+      de no máximo ``max_points`` pontos (mantém as proporções);
+    - acima: mapa de densidade 2-D (``np.histogram2d``) com ``grid`` células.
+    """
+    webgl: int = 5_000
+    sample: int = 100_000
+    heatmap: int = 1_000_000
+    max_points: int = 50_000
+    grid: int = 60
+
+
+def lod_mode(n: int, config: LODConfig = LODConfig()) -> str:
+    if n <= config.webgl:
+        return "svg"
+    if n <= config.sample:
+        return "webgl"
+    if n <= config.heatmap:
+        return "sample"
+    return "heatmap"
+
+
+def stratified_sample(groups, max_points: int, seed: int = 0) -> list:
+    """Amostra cada grupo na mesma fração, preservando as proporções entre eles."""
+    total = sum(len(g) for g in groups)
+    if total <= max_points:
+        return list(groups)
+    rng = np.random.default_rng(seed)
+    frac = max_points / total
+    return [g.iloc[np.sort(rng.choice(len(g), int(round(len(g) * frac)), replace=False))]
+            for g in groups]
+
+
+def scatter_traces(groups, x: str, y: str, styles, config: LODConfig = LODConfig()) -> list:
+    """Traces do scatter ``x × y`` com o nível de detalhe escolhido por ``lod_mode``.
+
+    ``groups`` são os recortes já separados (ex.: por ``Outcome``) e ``styles``
+    os dicts ``{"name":..., "marker":...}`` de cada um, na mesma ordem.
+    """
+    n = sum(len(g) for g in groups)
+    mode = lod_mode(n, config)
+
+    if mode == "heatmap":
+        data = [g[[x, y]].to_numpy(dtype="float64", na_value=np.nan) for g in groups]
+        data = np.concatenate(data) if data else np.empty((0, 2))
+        data = data[~np.isnan(data).any(axis=1)]
+        counts, xe, ye = np.histogram2d(data[:, 0], data[:, 1], bins=config.grid)
+        return [go.Heatmap(
+            x=(xe[:-1] + xe[1:]) / 2,
+            y=(ye[:-1] + ye[1:]) / 2,
+            z=np.where(counts.T > 0, counts.T, np.nan),
+            colorscale=[[0, styles[0]["marker"]["color"]], [1, styles[-1]["marker"]["color"]]],
+            colorbar=dict(title="Pacientes"),
+            name="Densidade",
+        )]
+
+    if mode == "sample":
+        groups = stratified_sample(groups, config.max_points)
+    trace = go.Scatter if mode == "svg" else go.Scattergl
+    return [trace(x=g[x], y=g[y], mode="markers", **style) for g, style in zip(groups, styles)]
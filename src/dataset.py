@@ -0,0 +1,256 @@
+"""Dataset versionado pelo conteúdo, com recarga em segundo plano.
+
+``DatasetStore`` mantém o snapshot atual (cohort preparado + ``CohortEngine``)
+de um arquivo de origem (ou diretório de shards). Um watcher compara
+periodicamente tamanho/mtime dos arquivos; se mudaram, a versão passa a ser o
+hash do conteúdo inteiro (``content_hash``) e, sendo nova, o snapshot é
+montado em segundo plano e trocado atomicamente; num diretório de shards em
+que só chegaram arquivos novos, apenas esses são lidos e acrescentados
+(``CohortEngine.append``). Quem já pegou o snapshot anterior (um rerun em
+andamento) continua com ele até terminar. Snapshots ficam num ``LRUCache``
+limitado por número de entradas e por bytes.
+
+A carga inicial também pode rodar em segundo plano (``load_async`` /
+``current(wait=False)``), inclusive a resolução do caminho (``resolve``), para
+a página desenhar sua estrutura antes de os dados existirem.
+"""
+import hashlib, io, logging, os, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
+
+import pandas as pd
+
+from src.cache import LRUCache
+from src.engine import CohortEngine
+from src.ingest import ingest_shards, is_sharded, load_store, read_shards, shard_paths
+from src.shared import shared_frame
+from src.utils import MemoryReport, clean_diabetes, compact_dtypes, derive_columns, read_table
+
+log = logging.getLogger(__name__)
+
+
+class Snapshot(NamedTuple):
+    version: str
+    engine: CohortEngine
+    memory_report: MemoryReport
+    source: str
+    loaded_at: float
+
+
+def _files(path: str) -> list:
+    return shard_paths(path) if is_sharded(path) else [path]
+
+
+def content_hash(path: str, block: int = 1 << 20) -> str:
+    """Hash (blake2b) do conteúdo inteiro: mesma versão para o mesmo conteúdo.
+
+    Para um diretório/glob de shards, o hash cobre nomes e conteúdos de todos.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for name in _files(path):
+        h.update(os.path.basename(name).encode())
+        with open(name, "rb") as fh:
+            for chunk in iter(lambda: fh.read(block), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def source_stat(path: str) -> tuple:
+    """Tamanho/mtime do arquivo (ou de cada shard): muda quando o conteúdo pode ter mudado."""
+    return tuple((name, (st_ := os.stat(name)).st_size, st_.st_mtime_ns) for name in _files(path))
+
+
+def build_snapshot(raw: pd.DataFrame, version: str, source: str, prepared: bool = False) -> Snapshot:
+    """Prepara ``raw`` (limpeza, derivadas, esquema compacto) e monta o engine."""
+    df, report = compact_dtypes(raw if prepared else derive_columns(clean_diabetes(raw)))
+    return Snapshot(version, CohortEngine(df, version=version), report, source, time.time())
+
+
+def load_snapshot(path: str, version: str | None = None) -> Snapshot:
+    """Snapshot de um CSV, de um diretório/glob de CSVs (shards processados em
+    paralelo) ou de um store Parquet já preparado (``src.ingest``).
+
+    O cohort preparado é compartilhado entre processos (``src.shared``): só o
+    primeiro a ver esta versão faz o trabalho, os outros mapeiam o resultado.
+    """
+    version = version or content_hash(path)
+
+    def build():
+        if is_sharded(path):
+            return compact_dtypes(ingest_shards(path))
+        if path.endswith(".parquet"):
+            return compact_dtypes(load_store(path))
+        return compact_dtypes(derive_columns(clean_diabetes(read_table(path))))
+
+    df, report = shared_frame(version, build, source=path)
+    return Snapshot(version, CohortEngine(df, version=version), report, path, time.time())
+
+
+def snapshot_bytes(snapshot: Snapshot) -> int:
+    return snapshot.memory_report.after
+
+
+def upload_snapshot(data: bytes, name: str, cache: LRUCache) -> Snapshot:
+    """Snapshot de um CSV enviado pela sidebar, deduplicado pelo hash do conteúdo."""
+    version = hashlib.blake2b(data, digest_size=8).hexdigest()
+    return cache.get_or_compute(version, lambda: build_snapshot(
+        pd.read_csv(io.BytesIO(data)), version, name))
+
+
+class DatasetStore:
+    def __init__(self, path: str | None, max_entries: int = 2, max_bytes: int | None = None,
+                 interval: float = 5.0, loader=load_snapshot, resolve=None):
+        self.path = path
+        self.resolve = resolve   # () -> caminho | None, chamado na carga inicial se path=None
+        self.interval = interval
+        self.loader = loader
+        self.cache = LRUCache(maxsize=max_entries, maxbytes=max_bytes, sizeof=snapshot_bytes)
+        self.last_error = None
+        self.refreshing = False
+        self._snapshot = None
+        self._stat = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dataset-loader")
+        self._pending = None
+        self._pending_lock = threading.Lock()
+        self._failed_at = 0.0
+
+    def current(self, wait: bool = True) -> Snapshot | None:
+        """Snapshot em uso. Pegue uma vez por rerun.
+
+        Antes da primeira carga terminar: com ``wait`` espera por ela (erros
+        são propagados); sem ``wait`` dispara a carga e devolve ``None``.
+        """
+        if self._snapshot is None:
+            pending = self.load_async()
+            if not wait:
+                return None
+            pending.result()
+        return self._snapshot   # leitura sem lock: a referência só é trocada inteira
+
+    def load_async(self) -> Future:
+        """Carga inicial em segundo plano (disparada uma única vez).
+
+        Se ela falhou, a próxima chamada a refaz — inclusive ``resolve`` —,
+        no máximo uma vez a cada ``interval`` segundos.
+        """
+        with self._pending_lock:
+            pending = self._pending
+            if pending is None or (pending.done() and pending.exception() is not None
+                                   and time.monotonic() - self._failed_at >= self.interval):
+                self._pending = self._executor.submit(self._initial_load)
+            return self._pending
+
+    def _initial_load(self) -> Snapshot:
+        try:
+            if self.path is None and self.resolve is not None:
+                self.path = self.resolve()
+            if self.path is None:
+                raise FileNotFoundError("nenhuma fonte de dados disponível")
+            self.refresh()
+            return self._snapshot
+        except BaseException:
+            self._failed_at = time.monotonic()
+            raise
+
+    @property
+    def status(self) -> str:
+        """``"ready"``, ``"loading"`` ou ``"error"`` (carga inicial)."""
+        if self._snapshot is not None:
+            return "ready"
+        pending = self._pending
+        return "error" if pending is not None and pending.done() and pending.exception() \
+            else "loading"
+
+    @property
+    def error(self) -> BaseException | None:
+        pending = self._pending
+        return pending.exception() if pending is not None and pending.done() else None
+
+    def refresh(self) -> bool:
+        """Recarrega se o conteúdo mudou; devolve ``True`` quando houve troca.
+
+        Numa fonte com shards em que só surgiram arquivos novos (os antigos
+        têm o mesmo tamanho/mtime), só os novos são lidos e acrescentados ao
+        snapshot atual (``append``), no fim do cohort.
+        """
+        with self._lock:   # uma recarga por vez (watcher × primeira sessão)
+            stat = source_stat(self.path)
+            if self._snapshot is not None and stat == self._stat:
+                return False
+            added = self._added_shards(stat)
+            if added:
+                self.refreshing = True
+                try:
+                    self._append(read_shards(added))
+                finally:
+                    self.refreshing = False
+                self._stat = stat
+                return True
+            version = content_hash(self.path)
+            self._stat = stat
+            if self._snapshot is not None and self._snapshot.version == version:
+                return False
+            self.refreshing = True   # o snapshot anterior continua sendo servido
+            try:
+                snapshot = self.cache.get_or_compute(version, lambda: self.loader(self.path, version))
+            finally:
+                self.refreshing = False
+            self._snapshot = snapshot   # troca atômica da referência
+            return True
+
+    def _added_shards(self, stat: tuple) -> list:
+        """Shards novos, se todos os já carregados continuam iguais; senão ``[]``."""
+        if self._snapshot is None or self._stat is None or not is_sharded(self.path):
+            return []
+        old = set(self._stat)
+        if not old < set(stat):
+            return []
+        return [entry[0] for entry in stat if entry not in old]
+
+    def append(self, raw: pd.DataFrame) -> Snapshot:
+        """Acrescenta linhas novas (esquema do CSV) ao snapshot atual, sem recarga.
+
+        O novo snapshot (``CohortEngine.append``) é trocado atomicamente. As
+        linhas acrescentadas valem até a próxima mudança do arquivo de origem,
+        quando o watcher recarrega o conteúdo do arquivo.
+        """
+        self.current()   # garante um snapshot carregado
+        with self._lock:   # appends e recargas em série
+            return self._append(raw)
+
+    def _append(self, raw: pd.DataFrame) -> Snapshot:
+        old = self._snapshot
+        engine = old.engine.append(raw)
+        report = MemoryReport(old.memory_report.before + int(raw.memory_usage(deep=True).sum()),
+                              int(engine.base.memory_usage(deep=True).sum()))
+        snapshot = Snapshot(engine.version, engine, report, old.source, time.time())
+        self.cache.put(engine.version, snapshot)
+        self._snapshot = snapshot   # troca atômica da referência
+        return snapshot
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            if self._snapshot is None:   # a carga inicial é de load_async: refeita se falhou
+                if self.status == "error":
+                    self.load_async()
+                continue
+            try:
+                if self.refresh():
+                    log.info("dataset %s recarregado (versão %s)", self.path, self._snapshot.version)
+                self.last_error = None
+            except Exception as e:   # mantém o último snapshot bom
+                self.last_error = e
+                log.warning("falha ao recarregar %s: %s", self.path, e)
+
+    def start_watcher(self) -> "DatasetStore":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
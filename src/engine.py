@@ -0,0 +1,235 @@
+"""Motor de agregação do cohort, independente do Streamlit.
+
+Reúne o que o dashboard calcula (filtros, KPIs, médias por ``Outcome``,
+insights, histograma) para que a página e a API HTTP (``src.api``) usem
+exatamente os mesmos números.
+"""
+import hashlib, math, threading
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np, pandas as pd
+
+from src.cache import LRUCache
+from src.filters import FilterIndex, filter_key, frame_mask, position_dtype
+from src.ingest import MedianImputer, median_labels
+from src.metrics import CohortStats, FitTable, histogram, summarize
+from src.neighbors import NeighborIndex
+from src.risk import DEFAULT_RULES, RULE_SETS, risk_score
+from src.utils import (CATEGORY_DTYPES, DERIVED_BINS, clean_diabetes, compact_dtypes,
+                       derive_columns)
+
+
+def prepare_cohort(raw: pd.DataFrame) -> pd.DataFrame:
+    """CSV bruto → cohort limpo, com colunas derivadas e esquema compacto."""
+    return compact_dtypes(derive_columns(clean_diabetes(raw)))[0]
+
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Versão do dataset a partir do conteúdo (quando não há arquivo de origem)."""
+    digest = int(pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype="uint64"))
+    return f"{digest:016x}"
+
+
+@dataclass(frozen=True)
+class CohortFilter:
+    age_range: tuple
+    glucose_range: tuple
+    bmi_categories: tuple
+    risk_level: str = "Todos"
+    age_groups: tuple | None = None
+    rules: str = DEFAULT_RULES.key
+
+    @property
+    def key(self) -> tuple:
+        return (self.rules, filter_key(self.age_range, self.glucose_range, self.bmi_categories,
+                                       self.risk_level, self.age_groups))
+
+    @classmethod
+    def from_key(cls, key: tuple) -> "CohortFilter":
+        rules, (age_range, glucose_range, bmi_categories, risk_level, age_groups) = key
+        return cls(age_range, glucose_range, bmi_categories, risk_level, age_groups, rules)
+
+
+class CohortResult(NamedTuple):
+    rows: np.ndarray          # posições (iloc) das linhas filtradas (int32 até 2³¹ linhas)
+    stats: CohortStats
+    glucose_hist: tuple       # (counts, edges)
+
+
+class CohortEngine:
+    """Cohort preparado + índices por tabela de regras + cache LRU de recortes.
+
+    O cache é limitado por entradas e pelos bytes das posições guardadas
+    (``cache_bytes``): em cohorts grandes, cada recorte pode ter dezenas de MB.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: str | None = None, cache_size: int = 64,
+                 cache_bytes: int | None = 256 << 20):
+        self.base = df
+        self.version = version or frame_version(df)
+        self.cache = LRUCache(maxsize=cache_size, maxbytes=cache_bytes,
+                              sizeof=lambda r: r.rows.nbytes)
+        self._scored, self._indexes, self._trends = {}, {}, {}
+        self._neighbors = None
+        self._imputer = None
+        self._bounds = None
+        self._lock = threading.Lock()
+
+    def scored(self, rules: str = DEFAULT_RULES.key) -> pd.DataFrame:
+        """Cohort com ``Risk_Score`` da tabela ``rules`` (só essa coluna é recalculada)."""
+        with self._lock:
+            if rules not in self._scored:
+                df = self.base
+                if rules != DEFAULT_RULES.key:
+                    df = df.assign(Risk_Score=risk_score(df, RULE_SETS[rules]))
+                self._scored[rules] = df
+            return self._scored[rules]
+
+    def index(self, rules: str = DEFAULT_RULES.key) -> FilterIndex:
+        df = self.scored(rules)
+        with self._lock:
+            if rules not in self._indexes:
+                self._indexes[rules] = FilterIndex(df)
+            return self._indexes[rules]
+
+    def trends(self, rules: str = DEFAULT_RULES.key) -> FitTable:
+        """Reta IMC × Glicose por bucket dos filtros (``FitTable``) da tabela ``rules``."""
+        df = self.scored(rules)
+        with self._lock:
+            if rules not in self._trends:
+                self._trends[rules] = FitTable.from_frame(df)
+            return self._trends[rules]
+
+    def neighbors(self) -> NeighborIndex:
+        """Índice de pacientes semelhantes (independe da tabela de regras)."""
+        with self._lock:
+            if self._neighbors is None:
+                self._neighbors = NeighborIndex(self.base)
+            return self._neighbors
+
+    def append(self, raw: pd.DataFrame, version: str | None = None) -> "CohortEngine":
+        """Novo engine com as linhas ``raw`` (esquema do CSV) no fim do cohort.
+
+        Só o bloco novo passa por limpeza, classificação e score; a imputação
+        usa medianas correntes (``MedianImputer``) e, se a mediana mudar de
+        faixa, apenas as linhas ausentes antigas são reclassificadas. Índices
+        de filtro e recortes em cache são estendidos com o bloco em vez de
+        refeitos. O engine atual não muda: quem o está usando continua vendo
+        o cohort anterior.
+        """
+        with self._lock:
+            imputer = self._imputer or MedianImputer.from_frame(self.base)
+            scored, indexes, trends = dict(self._scored), dict(self._indexes), dict(self._trends)
+        old_labels = median_labels(imputer.medians())
+        clean = clean_diabetes(raw)
+        imputer = imputer.extended(clean)
+        medians = imputer.medians()
+        block = compact_dtypes(derive_columns(clean, medians))[0]
+        n = len(self.base)
+
+        new_labels, relabel = median_labels(medians), {}
+        for col, (name, _, _) in DERIVED_BINS.items():
+            positions = imputer.missing[col][imputer.missing[col] < n]
+            if new_labels[name] != old_labels[name] and len(positions):
+                relabel[name] = (positions, new_labels[name])
+        base = pd.concat([self.base.astype(CATEGORY_DTYPES), block.astype(CATEGORY_DTYPES)],
+                         ignore_index=True)
+        for name, (positions, label) in relabel.items():
+            base.iloc[positions, base.columns.get_loc(name)] = label
+
+        engine = CohortEngine(base, version=version or _next_version(self.version, block),
+                              cache_size=self.cache.maxsize, cache_bytes=self.cache.maxbytes)
+        engine._imputer = imputer
+        blocks = {}
+        for rules in scored:
+            blocks[rules] = block if rules == DEFAULT_RULES.key else \
+                block.assign(Risk_Score=risk_score(block, RULE_SETS[rules]))
+            engine._scored[rules] = base if rules == DEFAULT_RULES.key else base.assign(
+                Risk_Score=np.concatenate([scored[rules]["Risk_Score"].to_numpy(),
+                                           blocks[rules]["Risk_Score"].to_numpy()]))
+        for rules, index in indexes.items():
+            index = index.extend(blocks[rules])
+            for name, (positions, label) in relabel.items():
+                index.relabel(name, positions, label)
+            engine._indexes[rules] = index
+        for rules, table in trends.items():   # reclassificação só mexe em linhas sem IMC/idade
+            engine._trends[rules] = table + FitTable.from_frame(blocks[rules])
+
+        if not relabel:   # com reclassificação, os recortes em cache são recalculados sob demanda
+            dtype = position_dtype(len(base))
+            for key, result in self.cache.items():
+                f = CohortFilter.from_key(key)
+                if f.rules not in blocks:
+                    continue
+                rows = FilterIndex(blocks[f.rules]).query(
+                    f.age_range, f.glucose_range, f.bmi_categories,
+                    age_groups=f.age_groups, risk_level=f.risk_level)
+                part = blocks[f.rules].iloc[rows]
+                counts, edges = result.glucose_hist
+                engine.cache.put(key, CohortResult(
+                    np.concatenate([result.rows, rows.astype(dtype) + n]).astype(dtype, copy=False),
+                    result.stats + summarize(part),
+                    (counts + histogram(part["Glucose"], bins=len(counts), range_=f.glucose_range)[0],
+                     edges)))
+        return engine
+
+    def bounds(self) -> dict:
+        """Limites inteiros dos sliders (idade e glicose), calculados uma vez por engine."""
+        if self._bounds is None:
+            self._bounds = {c: (int(self.base[c].min()), int(self.base[c].max()))
+                            for c in ("Age", "Glucose")}
+        return self._bounds
+
+    def default_filter(self, **overrides) -> CohortFilter:
+        b = self.bounds()
+        params = dict(age_range=b["Age"], glucose_range=b["Glucose"],
+                      bmi_categories=tuple(self.base["BMI_Category"].cat.categories))
+        params.update(overrides)
+        return CohortFilter(**params)
+
+    def query(self, f: CohortFilter) -> CohortResult:
+        def compute():
+            rows = self.index(f.rules).query(f.age_range, f.glucose_range, f.bmi_categories,
+                                             age_groups=f.age_groups, risk_level=f.risk_level)
+            cohort = self.scored(f.rules).iloc[rows]
+            trends = self.trends(f.rules)
+            trend = trends.fit(frame_mask(trends.table, f.age_range, f.glucose_range,
+                                          f.bmi_categories, f.age_groups, f.risk_level))
+            return CohortResult(rows, summarize(cohort, trend),
+                                histogram(cohort["Glucose"], bins=25, range_=f.glucose_range))
+        return self.cache.get_or_compute(f.key, compute)
+
+
+def _next_version(version: str, block: pd.DataFrame) -> str:
+    """Versão após um append: encadeia a versão anterior com o conteúdo do bloco."""
+    return hashlib.blake2b(f"{version}:{frame_version(block)}".encode(), digest_size=8).hexdigest()
+
+
+def _num(x):
+    x = float(x)
+    return None if math.isnan(x) else x
+
+
+def result_payload(result: CohortResult) -> dict:
+    """Resumo serializável em JSON (NaN → null)."""
+    s = result.stats
+    counts, edges = result.glucose_hist
+    return {
+        "total": s.total,
+        "diabetic": s.diabetic,
+        "diabetes_rate": _num(s.diabetes_rate),
+        "avg_glucose": _num(s.avg_glucose),
+        "avg_bmi": _num(s.avg_bmi),
+        "high_risk": s.high_risk,
+        "risk_percentage": _num(s.risk_percentage),
+        "high_glucose_rate": _num(s.high_glucose_rate),
+        "obesity_rate": _num(s.obesity_rate),
+        "outcome_counts": {"0": s.outcome_counts[0], "1": s.outcome_counts[1]},
+        "group_means": {str(o): {c: _num(v) for c, v in means.items()}
+                        for o, means in s.group_means.items()},
+        "trend": {"n": s.trend.n, "slope": _num(s.trend.slope),
+                  "intercept": _num(s.trend.intercept)},
+        "glucose_histogram": {"counts": [int(c) for c in counts],
+                              "edges": [float(e) for e in edges]},
+    }
@@ -0,0 +1,156 @@
+import numpy as np, pandas as pd
+
+# Faixas do seletor "Nível de Risco" (limites inclusivos; None = sem limite)
+RISK_LEVELS = {
+    "Todos": None,
+    "Baixo (0-2)": (None, 2),
+    "Moderado (3-5)": (3, 5),
+    "Alto (6-8)": (6, None),
+}
+
+
+class FilterIndex:
+    """Índice dos filtros da sidebar, construído uma vez por dataset.
+
+    - colunas de faixa (``Age``, ``Glucose``): posições ordenadas por valor,
+      consultadas com busca binária;
+    - colunas categóricas e faixas de ``Risk_Score``: um bitmap compactado
+      (``np.packbits``) por categoria, combinados com AND/OR byte a byte.
+
+    ``query`` devolve as posições (``iloc``, ``position_dtype``) das linhas que
+    passam nos filtros.
+    """
+
+    RANGE_COLUMNS = ("Age", "Glucose")
+    CATEGORY_COLUMNS = ("Age_Group", "BMI_Category", "Glucose_Level")
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+        self._order, self._sorted = {}, {}
+        for col in self.RANGE_COLUMNS:
+            values = df[col].to_numpy(dtype="float64", na_value=np.nan)
+            order = np.argsort(values, kind="stable")   # NaN vai para o fim
+            self._order[col], self._sorted[col] = order, values[order]
+        self._bitmaps = {col: {label: np.packbits(mask) for label, mask in masks.items()}
+                         for col, masks in self._masks(df).items()}
+        self._all = np.packbits(np.ones(self.n, dtype=bool))
+
+    @classmethod
+    def _masks(cls, df: pd.DataFrame) -> dict:
+        """Máscara booleana por categoria e por faixa de ``Risk_Score``."""
+        masks = {}
+        for col in cls.CATEGORY_COLUMNS:
+            cat = df[col].astype("category")
+            codes = cat.cat.codes.to_numpy()
+            masks[col] = {label: codes == i for i, label in enumerate(cat.cat.categories)}
+
+        score = df["Risk_Score"].to_numpy()
+        masks["Risk_Score"] = {}
+        for label, bounds in RISK_LEVELS.items():
+            if bounds:
+                lo = -np.inf if bounds[0] is None else bounds[0]
+                hi = np.inf if bounds[1] is None else bounds[1]
+                masks["Risk_Score"][label] = (score >= lo) & (score <= hi)
+        return masks
+
+    def extend(self, new: pd.DataFrame) -> "FilterIndex":
+        """Novo índice com as linhas de ``new`` no fim, sem reordenar o que já existe.
+
+        As posições ordenadas recebem o bloco novo (ordenado à parte) por
+        intercalação com ``searchsorted``; os bitmaps só ganham os bits novos.
+        """
+        out = object.__new__(FilterIndex)
+        out.n = self.n + len(new)
+        out._order, out._sorted = {}, {}
+        for col in self.RANGE_COLUMNS:
+            values = new[col].to_numpy(dtype="float64", na_value=np.nan)
+            order = np.argsort(values, kind="stable")
+            at = np.searchsorted(self._sorted[col], values[order], side="right")   # estável
+            out._sorted[col] = np.insert(self._sorted[col], at, values[order])
+            out._order[col] = np.insert(self._order[col], at, order + self.n)
+        masks = self._masks(new)
+        out._bitmaps = {col: {label: _append_bits(bits, self.n, masks[col].get(label, np.zeros(len(new), dtype=bool)))
+                              for label, bits in labels.items()}
+                        for col, labels in self._bitmaps.items()}
+        out._all = np.packbits(np.ones(out.n, dtype=bool))
+        return out
+
+    def relabel(self, col: str, positions: np.ndarray, label):
+        """Move ``positions`` para a categoria ``label`` de ``col`` (no próprio índice)."""
+        byte, bit = positions >> 3, (0x80 >> (positions & 7)).astype(np.uint8)
+        for bits in self._bitmaps[col].values():
+            np.bitwise_and.at(bits, byte, ~bit)
+        np.bitwise_or.at(self._bitmaps[col][label], byte, bit)
+
+    def range_bitmap(self, col: str, lo: float, hi: float) -> np.ndarray:
+        """Bitmap das linhas com ``lo <= col <= hi`` (NaN nunca entra)."""
+        values = self._sorted[col]
+        start = np.searchsorted(values, lo, side="left")
+        stop = np.searchsorted(values, hi, side="right")
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self._order[col][start:stop]] = True
+        return np.packbits(mask)
+
+    def category_bitmap(self, col: str, labels) -> np.ndarray:
+        """OR dos bitmaps das categorias selecionadas (rótulos ausentes são ignorados)."""
+        bits = np.zeros_like(self._all)
+        for label in labels:
+            if label in self._bitmaps[col]:
+                bits |= self._bitmaps[col][label]
+        return bits
+
+    def query(self, age_range, glucose_range, bmi_categories,
+              age_groups=None, risk_level: str = "Todos") -> np.ndarray:
+        bits = self.category_bitmap("BMI_Category", bmi_categories)
+        if age_groups is not None:
+            bits &= self.category_bitmap("Age_Group", age_groups)
+        if RISK_LEVELS.get(risk_level):
+            bits &= self._bitmaps["Risk_Score"][risk_level]
+        if bits.any():
+            bits &= self.range_bitmap("Age", *age_range)
+            bits &= self.range_bitmap("Glucose", *glucose_range)
+        return np.flatnonzero(np.unpackbits(bits, count=self.n)).astype(position_dtype(self.n))
+
+
+def frame_mask(df: pd.DataFrame, age_range, glucose_range, bmi_categories,
+               age_groups=None, risk_level: str = "Todos") -> np.ndarray:
+    """Mesma seleção de ``FilterIndex.query``, avaliada direto sobre ``df``.
+
+    Para tabelas pequenas (como os buckets de ``src.metrics.FitTable``), onde
+    montar um índice não compensa.
+    """
+    def between(col, lo, hi):
+        v = df[col].to_numpy(dtype="float64", na_value=np.nan)
+        return (v >= lo) & (v <= hi)
+
+    mask = df["BMI_Category"].isin(bmi_categories).to_numpy()
+    if age_groups is not None:
+        mask = mask & df["Age_Group"].isin(age_groups).to_numpy()
+    if bounds := RISK_LEVELS.get(risk_level):
+        mask = mask & between("Risk_Score", -np.inf if bounds[0] is None else bounds[0],
+                               np.inf if bounds[1] is None else bounds[1])
+    return mask & between("Age", *age_range) & between("Glucose", *glucose_range)
+
+
+def position_dtype(n: int):
+    """Inteiro das posições de ``n`` linhas: int32 (metade da memória) até 2³¹."""
+    return np.int32 if n < 2**31 else np.int64
+
+
+def _append_bits(bits: np.ndarray, n: int, mask) -> np.ndarray:
+    """Bitmap de ``n`` bits seguido de ``mask`` (só o último byte é refeito)."""
+    full = n // 8
+    tail = np.unpackbits(bits[full:full + 1], count=n % 8).astype(bool)
+    return np.concatenate([bits[:full], np.packbits(np.concatenate([tail, mask]))])
+
+
+def filter_key(age_range, glucose_range, bmi_categories,
+               risk_level: str = "Todos", age_groups=None) -> tuple:
+    """Chave normalizada do estado dos filtros (ordem de seleção não importa)."""
+    return (
+        tuple(int(v) for v in age_range),
+        tuple(int(v) for v in glucose_range),
+        tuple(sorted(bmi_categories)),
+        risk_level,
+        None if age_groups is None else tuple(sorted(age_groups)),
+    )
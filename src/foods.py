@@ -0,0 +1,124 @@
+"""Base de alimentos (``data/pred_food.csv``) tipada e indexada para consultas.
+
+Colunas numéricas têm posições ordenadas (consultas de faixa por busca
+binária) e as flags de adequação viram máscaras booleanas; ``query`` combina
+faixas, flags e os filtros prontos de ``PRESETS`` por AND.
+"""
+import numpy as np, pandas as pd
+
+from src.utils import protein_percentage
+
+FOOD_DTYPES = {
+    "Food Name": "string",
+    "Glycemic Index": "int16",
+    "Calories": "int16",
+    "Carbohydrates": "float32",
+    "Protein": "float32",
+    "Fat": "float32",
+    "Suitable for Diabetes": "bool",
+    "Suitable for Blood Pressure": "bool",
+    "Sodium Content": "int16",
+    "Potassium Content": "int16",
+    "Magnesium Content": "int16",
+    "Calcium Content": "int16",
+    "Fiber Content": "float32",
+}
+
+FLAG_COLUMNS = {
+    "diabetes": "Suitable for Diabetes",
+    "blood_pressure": "Suitable for Blood Pressure",
+}
+
+# Filtros prontos: nome -> (coluna, mínimo, máximo), limites inclusivos
+PRESETS = {
+    "low_gi": ("Glycemic Index", None, 55),        # IG baixo (≤ 55)
+    "low_sodium": ("Sodium Content", None, 140),   # baixo sódio (≤ 140 mg)
+    "high_fiber": ("Fiber Content", 5, None),      # rico em fibras (≥ 5 g)
+    "low_gl": ("Glycemic Load", None, 10),         # carga glicêmica baixa (≤ 10)
+}
+
+PRESET_LABELS = {
+    "low_gi": "IG baixo (≤ 55)",
+    "low_sodium": "Baixo sódio (≤ 140 mg)",
+    "high_fiber": "Rico em fibras (≥ 5 g)",
+    "low_gl": "Carga glicêmica baixa (≤ 10)",
+}
+
+_YES_NO = {"1": True, "0": False, "yes": True, "no": False, "true": True, "false": False}
+
+
+def prepare_foods(df: pd.DataFrame) -> pd.DataFrame:
+    """Tipos explícitos + colunas derivadas vetorizadas.
+
+    - ``Percentual_Proteina`` / ``Percentual_Carboidrato`` / ``Percentual_Gordura``:
+      fração das calorias (4/4/9 kcal por grama); NaN quando ``Calories`` é 0;
+    - ``Glycemic Load``: IG × carboidratos (g) / 100.
+    """
+    flags = {c: df[c].astype(str).str.strip().str.lower().map(_YES_NO).fillna(False)
+             for c in FLAG_COLUMNS.values()}
+    df = df.assign(**flags).astype({c: t for c, t in FOOD_DTYPES.items() if c in df.columns})
+    kcal = df["Calories"].astype("float32").replace(0, np.nan)
+    df = protein_percentage(df.assign(Calories=kcal)).assign(Calories=df["Calories"])
+    return df.assign(**{
+        "Percentual_Carboidrato": (df["Carbohydrates"] * 4 / kcal * 100).astype("float32"),
+        "Percentual_Gordura": (df["Fat"] * 9 / kcal * 100).astype("float32"),
+        "Percentual_Proteina": df["Percentual_Proteina"].astype("float32"),
+        "Glycemic Load": (df["Glycemic Index"] * df["Carbohydrates"] / 100).astype("float32"),
+    })
+
+
+class FoodIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.df = prepare_foods(df).reset_index(drop=True)
+        self.n = len(self.df)
+        self._order, self._sorted = {}, {}
+        for col in self.df.select_dtypes("number").columns:
+            values = self.df[col].to_numpy(dtype="float64", na_value=np.nan)
+            order = np.argsort(values, kind="stable")   # NaN vai para o fim
+            self._order[col], self._sorted[col] = order, values[order]
+        self._flags = {name: self.df[col].to_numpy(dtype=bool)
+                       for name, col in FLAG_COLUMNS.items()}
+
+    @classmethod
+    def load(cls, path: str = "data/pred_food.csv") -> "FoodIndex":
+        return cls(pd.read_csv(path))
+
+    @property
+    def numeric_columns(self) -> list:
+        return list(self._order)
+
+    def range_mask(self, col: str, lo=None, hi=None) -> np.ndarray:
+        """Máscara das linhas com ``lo <= col <= hi`` (NaN nunca entra)."""
+        values = self._sorted[col]
+        start = 0 if lo is None else np.searchsorted(values, lo, side="left")
+        stop = np.searchsorted(values, np.inf if hi is None else hi, side="right")
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self._order[col][start:stop]] = True
+        return mask
+
+    def mask(self, ranges: dict | None = None, flags=(), presets=()) -> np.ndarray:
+        mask = np.ones(self.n, dtype=bool)
+        for name in flags:
+            mask &= self._flags[name]
+        for name in presets:
+            col, lo, hi = PRESETS[name]
+            mask &= self.range_mask(col, lo, hi)
+        for col, (lo, hi) in (ranges or {}).items():
+            mask &= self.range_mask(col, lo, hi)
+        return mask
+
+    def query(self, ranges: dict | None = None, flags=(), presets=(),
+              sort_by: str | None = None, limit: int | None = None) -> pd.DataFrame:
+        """Alimentos que atendem a todas as condições.
+
+        ``ranges``: ``{coluna: (mín, máx)}`` (``None`` = aberto); ``flags``: chaves
+        de ``FLAG_COLUMNS``; ``presets``: chaves de ``PRESETS``. Com ``sort_by``,
+        a ordem vem do índice já ordenado da coluna (sem novo sort).
+        """
+        mask = self.mask(ranges, flags, presets)
+        if sort_by is None:
+            rows = np.flatnonzero(mask)
+        else:
+            order = self._order[sort_by]
+            rows = order[mask[order]]
+        return self.df.iloc[rows[:limit] if limit else rows]
@@ -0,0 +1,272 @@
+"""Ingestão em blocos de cohorts maiores que a memória.
+
+Uso::
+
+    python -m src.ingest data/diabetes.csv data/cohort.parquet --chunksize 250000
+    python -m src.ingest "data/clinicas/*.csv" data/cohort.parquet --workers 32
+
+e depois ``DASHBOARD_COHORT_STORE=data/cohort.parquet streamlit run Home.py``.
+Um diretório ou glob de CSVs (um por clínica) é processado em paralelo
+(``ingest_shards``).
+"""
+import argparse, glob, os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np, pandas as pd
+
+from src.utils import (CATEGORY_DTYPES, CSV_DTYPES, DERIVED_BINS, clean_diabetes,
+                       compact_dtypes, derive_columns)
+
+CLEANED_COLUMNS = ["Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI"]
+
+
+class StreamingMedian:
+    """Mediana exata a partir de contagens por valor.
+
+    A memória é limitada pela cardinalidade da coluna (idades, glicemias e IMC
+    com uma casa decimal têm poucas centenas de valores distintos), não pelo
+    número de linhas. A mediana segue ``pd.Series.median`` (média dos dois
+    valores centrais quando ``n`` é par).
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.n = 0
+
+    def update(self, values) -> "StreamingMedian":
+        vc = pd.Series(values).dropna().value_counts()
+        self.counts.update(dict(zip(vc.index.tolist(), vc.tolist())))
+        self.n += int(vc.sum())
+        return self
+
+    def merge(self, other: "StreamingMedian") -> "StreamingMedian":
+        self.counts.update(other.counts)
+        self.n += other.n
+        return self
+
+    def median(self) -> float:
+        if not self.n:
+            return np.nan
+        keys = np.array(sorted(self.counts), dtype="float64")
+        cum = np.cumsum([self.counts[k] for k in sorted(self.counts)])
+        lo = keys[np.searchsorted(cum, (self.n - 1) // 2 + 1)]
+        hi = keys[np.searchsorted(cum, self.n // 2 + 1)]
+        return float((lo + hi) / 2)
+
+
+class MedianImputer:
+    """Medianas correntes das colunas classificadas (``DERIVED_BINS``) e as
+    posições das linhas ausentes em cada uma, atualizadas a cada bloco novo.
+
+    Quando a mediana muda de faixa, só as linhas ausentes precisam ser
+    reclassificadas (``missing``); o resto do cohort não é tocado.
+    """
+
+    def __init__(self, sketches: dict | None = None, missing: dict | None = None, n: int = 0):
+        self.sketches = sketches or {c: StreamingMedian() for c in DERIVED_BINS}
+        self.missing = missing or {c: np.empty(0, dtype=np.int64) for c in DERIVED_BINS}
+        self.n = n
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "MedianImputer":
+        return cls().extended(df)
+
+    def extended(self, df: pd.DataFrame) -> "MedianImputer":
+        """Novo imputador com as linhas (já limpas) de ``df`` no fim."""
+        sketches, missing = {}, {}
+        for c, sketch in self.sketches.items():
+            values = df[c].to_numpy(dtype="float64", na_value=np.nan)
+            new = StreamingMedian()
+            new.counts, new.n = sketch.counts.copy(), sketch.n
+            sketches[c] = new.update(values)
+            missing[c] = np.concatenate([self.missing[c], np.flatnonzero(np.isnan(values)) + self.n])
+        return MedianImputer(sketches, missing, self.n + len(df))
+
+    def medians(self) -> dict:
+        return {c: s.median() for c, s in self.sketches.items()}
+
+
+def median_labels(medians: dict) -> dict:
+    """Categoria que a mediana de cada coluna recebe: ``{classificação: rótulo}``."""
+    return {name: pd.cut([medians[col]], bins=bins, labels=labels)[0]
+            for col, (name, bins, labels) in DERIVED_BINS.items()}
+
+
+def _prepare_block(block: pd.DataFrame, medians: dict) -> pd.DataFrame:
+    # Esquema compacto fixo (COMPACT_DTYPES): mesmo schema Arrow em todos os blocos
+    return compact_dtypes(derive_columns(clean_diabetes(block), medians))[0]
+
+
+def _read_blocks(path: str, chunksize: int, usecols=None):
+    return pd.read_csv(path, chunksize=chunksize, usecols=usecols,
+                       dtype={c: t for c, t in CSV_DTYPES.items()
+                              if usecols is None or c in usecols})
+
+
+def column_medians(path: str, chunksize: int = 250_000) -> dict:
+    """1ª passada: medianas (após a limpeza) das colunas usadas nas classificações."""
+    cols = list(DERIVED_BINS)
+    sketches = {c: StreamingMedian() for c in cols}
+    for block in _read_blocks(path, chunksize, usecols=cols):
+        block = block.replace({c: {0: np.nan} for c in cols if c in CLEANED_COLUMNS})
+        for c in cols:
+            sketches[c].update(block[c])
+    return {c: s.median() for c, s in sketches.items()}
+
+
+def ingest_chunked(src: str, dest: str, chunksize: int = 250_000) -> dict:
+    """Converte ``src`` (CSV) no store colunar ``dest`` (Parquet) bloco a bloco.
+
+    Cada bloco passa por ``clean_diabetes``, ``derive_columns`` (com as medianas
+    globais da 1ª passada) e ``compact_dtypes`` e vira um row group; o pico de
+    memória é de um bloco.
+    Devolve ``{"rows": ..., "row_groups": ..., "medians": ...}``.
+    """
+    import pyarrow as pa
+
+    medians = column_medians(src, chunksize)
+    rows = 0
+
+    def tables():
+        nonlocal rows
+        for block in _read_blocks(src, chunksize):
+            rows += len(block)
+            yield pa.Table.from_pandas(_prepare_block(block, medians), preserve_index=False)
+
+    groups = write_parquet(dest, tables())
+    if not groups:
+        raise ValueError(f"{src} não contém linhas")
+    return {"rows": rows, "row_groups": groups, "medians": medians}
+
+
+def write_parquet(dest: str, tables, **kwargs) -> int:
+    """Grava as tabelas pyarrow de ``tables`` em ``dest``, uma a uma (``kwargs``
+    vão para ``write_table``), e devolve quantas foram gravadas.
+
+    O arquivo só aparece completo (temporário + ``os.replace``); se algo falhar,
+    o temporário é apagado. Sem tabelas, nada é gravado.
+    """
+    import pyarrow.parquet as pq
+
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    writer, count = None, 0
+    try:
+        for table in tables:
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table.cast(writer.schema), **kwargs)
+            count += 1
+        if writer is not None:
+            writer.close()
+            os.replace(tmp, dest)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return count
+
+
+def load_store(path: str, columns=None) -> pd.DataFrame:
+    """Carrega o store colunar (opcionalmente só ``columns``)."""
+    return pd.read_parquet(path, columns=columns)
+
+
+def shard_paths(source: str) -> list:
+    """CSVs de um diretório, glob ou arquivo único, em ordem de nome."""
+    if os.path.isdir(source):
+        source = os.path.join(source, "*.csv")
+    paths = sorted(glob.glob(source))
+    if not paths:
+        raise FileNotFoundError(f"nenhum CSV em {source}")
+    return paths
+
+
+def is_sharded(source: str) -> bool:
+    return os.path.isdir(source) or glob.has_magic(source)
+
+
+def read_shards(paths) -> pd.DataFrame:
+    """CSVs brutos (esquema do CSV) concatenados na ordem dada."""
+    return pd.concat([pd.read_csv(p, dtype=CSV_DTYPES) for p in paths], ignore_index=True)
+
+
+def _ingest_shard(path: str):
+    """Worker: CSV → tabela Arrow no esquema compacto + contagens das medianas.
+
+    As classificações saem sem imputação (ausente fica sem categoria): a
+    mediana certa é a do cohort inteiro, só conhecida depois de todos os shards.
+    """
+    import pyarrow as pa
+
+    df = clean_diabetes(pd.read_csv(path, dtype=CSV_DTYPES))
+    sketches = {c: StreamingMedian().update(df[c]) for c in DERIVED_BINS}
+    df = compact_dtypes(derive_columns(df, {c: np.nan for c in DERIVED_BINS}))[0]
+    return pa.Table.from_pandas(df, preserve_index=False), sketches
+
+
+def ingest_shards(source: str, workers: int | None = None) -> pd.DataFrame:
+    """Cohort preparado a partir de vários CSVs, processados em paralelo.
+
+    Cada processo lê, limpa, deriva e compacta um shard e devolve uma tabela
+    Arrow (colunar, serializada sem cópia de linha a linha). As tabelas são
+    concatenadas sem cópia (``concat_tables`` só encadeia os blocos) e
+    convertidas para pandas uma única vez com ``self_destruct``, liberando
+    cada bloco Arrow à medida que é convertido. Por fim, os ausentes das
+    classificações recebem a categoria da mediana global (mesmo resultado de
+    preparar o CSV concatenado).
+    """
+    import pyarrow as pa
+
+    paths = shard_paths(source)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            results = list(pool.map(_ingest_shard, paths))
+    else:
+        results = [_ingest_shard(p) for p in paths]
+
+    tables = [t for t, _ in results]
+    medians = {c: StreamingMedian() for c in DERIVED_BINS}
+    for _, sketches in results:
+        for c, sketch in sketches.items():
+            medians[c].merge(sketch)
+    del results
+    schema = tables[0].schema
+    table = pa.concat_tables([t.cast(schema) for t in tables])
+    del tables
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+
+    fill = median_labels({c: m.median() for c, m in medians.items()})
+    out = {}
+    for col, (name, _, _) in DERIVED_BINS.items():
+        codes = df[name].astype(CATEGORY_DTYPES[name])
+        out[name] = codes.fillna(fill[name]) if codes.isna().any() else codes
+    return df.assign(**out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestão em blocos do cohort para Parquet")
+    parser.add_argument("src", help="CSV, diretório ou glob de CSVs")
+    parser.add_argument("dest")
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    args = parser.parse_args(argv)
+    if is_sharded(args.src):
+        import pyarrow as pa
+
+        df = ingest_shards(args.src, args.workers)
+        write_parquet(args.dest, [pa.Table.from_pandas(df, preserve_index=False)],
+                      row_group_size=args.chunksize)
+        print(f"{len(df)} linhas de {len(shard_paths(args.src))} shards → {args.dest}")
+        return
+    info = ingest_chunked(args.src, args.dest, args.chunksize)
+    print(f"{info['rows']} linhas em {info['row_groups']} blocos → {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Gerador de planos alimentares sobre a base de alimentos (``src.foods``).
+
+Cada refeição é montada por um guloso vetorizado: a cada passo, todas as
+combinações (paciente × alimento) são avaliadas de uma vez e entra o alimento
+que mais reduz o custo
+
+    custo = |kcal − meta| / meta  +  macro_weight · Σ|% macro − split|
+            +  gl_weight · carga glicêmica / 10
+
+respeitando o teto ``meta · (1 + tolerance)`` de calorias (limite rígido) e
+sem repetir alimentos no mesmo dia. Nos primeiros ``min_items`` passos a meta
+de calorias cresce em frações iguais, o que distribui as porções. Pacientes
+são processados em blocos (lote de muitos pacientes com memória limitada).
+"""
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np, pandas as pd
+
+from src.foods import FoodIndex
+
+
+class MacroSplit(NamedTuple):
+    """Percentual das calorias vindo de carboidratos, proteínas e gorduras."""
+    carbs: float
+    protein: float
+    fat: float
+
+
+DIABETES_SPLIT = MacroSplit(30, 30, 40)   # "Dieta Diabetes" da aba nutricional
+STANDARD_SPLIT = MacroSplit(45, 20, 35)   # "Dieta Padrão"
+
+# Fração das calorias do dia por refeição (cardápio de referência: 320/450/380 kcal)
+MEALS = {"Café da manhã": 320 / 1150, "Almoço": 450 / 1150, "Jantar": 380 / 1150}
+
+BLOCK_CELLS = 1 << 20   # paciente × alimento avaliados por bloco
+
+
+@dataclass(frozen=True)
+class PlanTargets:
+    kcal: float = 1150
+    split: MacroSplit = DIABETES_SPLIT
+    tolerance: float = 0.10
+    min_items: int = 3
+    max_items: int = 5
+    macro_weight: float = 0.5
+    gl_weight: float = 0.1
+
+
+class MealPlans(NamedTuple):
+    items: pd.DataFrame    # uma linha por alimento escolhido
+    totals: pd.DataFrame   # uma linha por (paciente, refeição)
+
+
+class MealPlanner:
+    def __init__(self, foods: FoodIndex, flags=("diabetes",)):
+        pool = foods.query(flags=flags)
+        pool = pool[pool["Calories"] > 0].drop_duplicates("Food Name").reset_index(drop=True)
+        self.foods = pool
+        # Por alimento: kcal, kcal de carboidrato/proteína/gordura e carga glicêmica
+        self._kcal = pool["Calories"].to_numpy(np.float64)
+        self._macro = np.column_stack([pool["Carbohydrates"] * 4, pool["Protein"] * 4,
+                                       pool["Fat"] * 9]).astype(np.float64)
+        self._gl = pool["Glycemic Load"].to_numpy(np.float64)
+
+    def _cost(self, kcal, macro, gl, target, split, t: PlanTargets):
+        total = macro.sum(-1, keepdims=True)
+        shares = np.divide(macro, total, out=np.zeros_like(macro), where=total > 0)
+        return (np.abs(kcal - target) / target
+                + t.macro_weight * np.abs(shares - split).sum(-1)
+                + t.gl_weight * gl / 10)
+
+    def _meal(self, targets: np.ndarray, used: np.ndarray, t: PlanTargets) -> np.ndarray:
+        """Escolhas ``(P, max_items)`` (``-1`` = vazio) para metas ``targets`` (P,)."""
+        P, F = used.shape
+        split = np.asarray(t.split, dtype=np.float64) / 100
+        picks = np.full((P, t.max_items), -1)
+        kcal, gl = np.zeros(P), np.zeros(P)
+        macro = np.zeros((P, 3))
+        active = np.ones(P, dtype=bool)
+        ceiling = targets * (1 + t.tolerance)
+        for step in range(t.max_items):
+            goal = targets * min(1.0, (step + 1) / t.min_items)
+            cand_kcal = kcal[:, None] + self._kcal
+            cost = self._cost(cand_kcal, macro[:, None, :] + self._macro, gl[:, None] + self._gl,
+                              goal[:, None], split, t)
+            cost[used | (cand_kcal > ceiling[:, None]) | ~active[:, None]] = np.inf
+            best = cost.argmin(1)
+            best_cost = cost[np.arange(P), best]
+            take = np.isfinite(best_cost)
+            if step >= t.min_items:   # depois do mínimo, só entra o que melhora
+                take &= best_cost < self._cost(kcal, macro, gl, targets, split, t) - 1e-9
+            if not take.any():
+                break
+            rows = np.flatnonzero(take)
+            picks[rows, step] = best[rows]
+            used[rows, best[rows]] = True
+            kcal[rows] += self._kcal[best[rows]]
+            macro[rows] += self._macro[best[rows]]
+            gl[rows] += self._gl[best[rows]]
+            active &= take
+        return picks
+
+    def plan_batch(self, kcal, targets: PlanTargets = PlanTargets(), meals: dict = MEALS) -> MealPlans:
+        """Planos do dia para vários pacientes; ``kcal``: meta diária de cada um."""
+        kcal = np.atleast_1d(np.asarray(kcal, dtype=np.float64))
+        F = len(self.foods)
+        block = max(1, BLOCK_CELLS // max(F, 1))
+        items, totals = [], []
+        for start in range(0, len(kcal), block):
+            daily = kcal[start:start + block]
+            used = np.zeros((len(daily), F), dtype=bool)
+            for meal, share in meals.items():
+                picks = self._meal(daily * share, used, targets)
+                patient, slot = np.nonzero(picks >= 0)
+                chosen = picks[patient, slot]
+                items.append(self.foods.iloc[chosen][[
+                    "Food Name", "Calories", "Carbohydrates", "Protein", "Fat",
+                    "Glycemic Index", "Glycemic Load"]].assign(
+                        patient=patient + start, meal=meal).reset_index(drop=True))
+                totals.append(self._totals(picks, daily * share, start, meal, targets))
+        items = pd.concat(items, ignore_index=True)
+        items["meal"] = pd.Categorical(items["meal"], categories=list(meals))
+        items = items.sort_values(["patient", "meal"], kind="stable").reset_index(drop=True)
+        totals = pd.concat(totals, ignore_index=True)
+        totals["meal"] = pd.Categorical(totals["meal"], categories=list(meals))
+        return MealPlans(items, totals.sort_values(["patient", "meal"], kind="stable")
+                         .reset_index(drop=True))
+
+    def plan(self, kcal: float = 1150, targets: PlanTargets = PlanTargets(),
+             meals: dict = MEALS) -> MealPlans:
+        return self.plan_batch([kcal], targets, meals)
+
+    def _totals(self, picks, target, start, meal, t: PlanTargets) -> pd.DataFrame:
+        mask = picks >= 0
+        idx = np.where(mask, picks, 0)
+        kcal = (self._kcal[idx] * mask).sum(1)
+        macro = (self._macro[idx] * mask[..., None]).sum(1)
+        total = macro.sum(1, keepdims=True)
+        shares = np.divide(macro, total, out=np.zeros_like(macro), where=total > 0) * 100
+        return pd.DataFrame({
+            "patient": np.arange(len(picks)) + start,
+            "meal": meal,
+            "target_kcal": target.round(),
+            "kcal": kcal,
+            "carbs_pct": shares[:, 0],
+            "protein_pct": shares[:, 1],
+            "fat_pct": shares[:, 2],
+            "glycemic_load": (self._gl[idx] * mask).sum(1),
+            "items": mask.sum(1),
+            "feasible": np.abs(kcal - target) <= target * t.tolerance,
+        })
@@ -0,0 +1,239 @@
+from dataclasses import dataclass, field
+
+import numpy as np, pandas as pd
+
+GROUP_COLUMNS = ["Glucose", "BMI", "BloodPressure", "Age"]
+BLOCK_ROWS = 1 << 16   # linhas por bloco da reta (temporários float64 cabem no cache)
+
+# Colunas da matriz acumulada por Outcome: [linhas, alto risco, glicose > 140,
+# IMC > 30, (soma, n válidos) de cada coluna de GROUP_COLUMNS]
+_ROWS, _HIGH_RISK, _HIGH_GLUCOSE, _OBESE, _SUMS = range(5)
+
+
+@dataclass(frozen=True)
+class LinearFit:
+    """Regressão linear ``y = slope·x + intercept`` por estatísticas suficientes.
+
+    Guarda apenas ``n, Σx, Σy, Σxy, Σx²`` (e o intervalo de x); somar dois
+    ajustes equivale a ajustar a união dos dados, então blocos de linhas ou
+    dados novos entram sem refazer o ajuste desde o início.
+    """
+    n: int = 0
+    sx: float = 0.0
+    sy: float = 0.0
+    sxy: float = 0.0
+    sxx: float = 0.0
+    xmin: float = np.inf
+    xmax: float = -np.inf
+
+    @classmethod
+    def from_arrays(cls, x, y) -> "LinearFit":
+        x = np.asarray(x, dtype="float64")
+        y = np.asarray(y, dtype="float64")
+        ok = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[ok], y[ok]
+        if not len(x):
+            return cls()
+        return cls(len(x), x.sum(), y.sum(), x @ y, x @ x, x.min(), x.max())
+
+    def __add__(self, other: "LinearFit") -> "LinearFit":
+        return LinearFit(self.n + other.n, self.sx + other.sx, self.sy + other.sy,
+                         self.sxy + other.sxy, self.sxx + other.sxx,
+                         min(self.xmin, other.xmin), max(self.xmax, other.xmax))
+
+    @property
+    def slope(self) -> float:
+        den = self.n * self.sxx - self.sx ** 2
+        return (self.n * self.sxy - self.sx * self.sy) / den if den else np.nan
+
+    @property
+    def intercept(self) -> float:
+        return (self.sy - self.slope * self.sx) / self.n if self.n else np.nan
+
+    def predict(self, x):
+        return self.slope * np.asarray(x, dtype="float64") + self.intercept
+
+
+# Colunas lidas pelos filtros da sidebar: um ``LinearFit`` por combinação
+TREND_KEYS = ["Age", "Glucose", "BMI_Category", "Age_Group", "Risk_Score"]
+FIT_BLOCK_ROWS = 1 << 18   # linhas por bloco na montagem da FitTable
+_FIT_AGG = {"n": "sum", "sx": "sum", "sy": "sum", "sxy": "sum", "sxx": "sum",
+            "xmin": "min", "xmax": "max"}
+
+
+class FitTable:
+    """Estatísticas suficientes de Glicose ~ IMC por bucket de ``TREND_KEYS``.
+
+    Cada linha de ``table`` soma as linhas do cohort com os mesmos valores de
+    idade, glicose, categorias e score; como os filtros só leem essas colunas,
+    qualquer recorte é uma união de buckets e sua reta sai de ``fit`` sem
+    voltar às linhas. Linhas sem IMC, glicose ou idade não entram (nunca
+    contam na reta ou nunca passam nos filtros de faixa).
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "FitTable":
+        """Tabela de ``df`` acumulada em blocos de ``FIT_BLOCK_ROWS`` linhas: a
+        memória extra é a de um bloco (e da própria tabela), não a do cohort.
+        As tabelas parciais são fundidas quando somam um bloco de linhas."""
+        parts = []
+        for start in range(0, max(len(df), 1), FIT_BLOCK_ROWS):
+            parts.append(_buckets(df.iloc[start:start + FIT_BLOCK_ROWS]))
+            if len(parts) > 1 and sum(map(len, parts)) >= FIT_BLOCK_ROWS:
+                parts = [_group(pd.concat(parts, ignore_index=True))]
+        return cls(parts[0] if len(parts) == 1 else _group(pd.concat(parts, ignore_index=True)))
+
+    def __add__(self, other: "FitTable") -> "FitTable":
+        return FitTable(_group(pd.concat([self.table, other.table], ignore_index=True)))
+
+    def fit(self, mask: np.ndarray) -> LinearFit:
+        """``LinearFit`` da união dos buckets selecionados por ``mask``."""
+        t = self.table[mask]
+        if not len(t):
+            return LinearFit()
+        return LinearFit(int(t["n"].sum()), *(float(t[c].sum()) for c in ("sx", "sy", "sxy", "sxx")),
+                         float(t["xmin"].min()), float(t["xmax"].max()))
+
+
+def _buckets(df: pd.DataFrame) -> pd.DataFrame:
+    x, y = _as_float(df, "BMI"), _as_float(df, "Glucose")
+    ok = ~(np.isnan(x) | np.isnan(y) | df["Age"].isna().to_numpy())
+    x, y = x[ok], y[ok]
+    return _group(df.loc[ok, TREND_KEYS].reset_index(drop=True).assign(
+        n=1, sx=x, sy=y, sxy=x * y, sxx=x * x, xmin=x, xmax=x))
+
+
+def _group(parts: pd.DataFrame) -> pd.DataFrame:
+    return parts.groupby(TREND_KEYS, observed=True, dropna=False, sort=False) \
+        .agg(_FIT_AGG).reset_index()
+
+
+@dataclass(frozen=True)
+class CohortStats:
+    """Resumo imutável de um recorte, consumido pelos KPIs, pizza e insights."""
+    total: int
+    diabetic: int
+    avg_glucose: float
+    avg_bmi: float
+    high_risk: int
+    high_glucose: int
+    obese: int
+    outcome_counts: tuple            # (não diabéticos, diabéticos)
+    outcome_means: tuple             # ((outcome, (médias de GROUP_COLUMNS)), ...)
+    trend: LinearFit = LinearFit()   # Glicose ~ IMC
+    # Somas por Outcome que geram os campos acima: somar dois resumos (``+``)
+    # equivale a resumir a união das linhas
+    acc: np.ndarray = field(default=None, repr=False, compare=False)
+
+    def __add__(self, other: "CohortStats") -> "CohortStats":
+        return _from_acc(self.acc + other.acc, self.trend + other.trend, self.total + other.total)
+
+    @property
+    def diabetes_rate(self) -> float:
+        return self.diabetic / self.total * 100 if self.total else 0
+
+    @property
+    def risk_percentage(self) -> float:
+        return self.high_risk / self.total * 100 if self.total else 0
+
+    @property
+    def high_glucose_rate(self) -> float:
+        return self.high_glucose / self.total * 100 if self.total else 0
+
+    @property
+    def obesity_rate(self) -> float:
+        return self.obese / self.total * 100 if self.total else 0
+
+    @property
+    def group_means(self) -> dict:
+        """``{outcome: {coluna: média}}`` apenas para os grupos presentes."""
+        return {o: dict(zip(GROUP_COLUMNS, means)) for o, means in self.outcome_means}
+
+
+def _as_float(df: pd.DataFrame, col: str) -> np.ndarray:
+    return df[col].to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _column(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Coluna no dtype nativo, sem cópia (nullable vira float64 com NaN)."""
+    values = df[col]
+    return values.to_numpy() if isinstance(values.dtype, np.dtype) else _as_float(df, col)
+
+
+def summarize(df: pd.DataFrame, trend: LinearFit | None = None) -> CohortStats:
+    """Calcula todas as estatísticas do painel sobre as colunas no dtype nativo.
+
+    Cada soma/contagem é feita no recorte inteiro e nas linhas diabéticas
+    (``take`` das posições com ``Outcome == 1``); o grupo não diabético sai da
+    diferença. A reta de tendência IMC × Glicose vem pronta em ``trend`` (ver
+    ``FitTable``) ou é acumulada bloco a bloco (``LinearFit``).
+    """
+    n = len(df)
+    diabetic = np.flatnonzero(_column(df, "Outcome"))
+    parts = {}
+    for col in GROUP_COLUMNS + ["Risk_Score"]:
+        values = _column(df, col)
+        parts[col] = (values, values.take(diabetic))
+
+    acc = np.zeros((2, _SUMS + 2 * len(GROUP_COLUMNS)))
+
+    def put(j, col, reduce):
+        total, diab = (reduce(v) for v in parts[col])
+        acc[:, j] = total - diab, diab
+
+    acc[:, _ROWS] = n - len(diabetic), len(diabetic)
+    put(_HIGH_RISK, "Risk_Score", lambda v: np.count_nonzero(v >= 6))
+    put(_HIGH_GLUCOSE, "Glucose", lambda v: np.count_nonzero(v > 140))
+    put(_OBESE, "BMI", lambda v: np.count_nonzero(v > 30))
+    for i, col in enumerate(GROUP_COLUMNS):
+        put(_SUMS + 2 * i, col, lambda v: np.nansum(v, dtype="float64"))
+        put(_SUMS + 2 * i + 1, col, lambda v: len(v) - np.count_nonzero(np.isnan(v)))
+
+    if trend is None:
+        glucose, bmi = parts["Glucose"][0], parts["BMI"][0]
+        trend = LinearFit()
+        for start in range(0, n, BLOCK_ROWS):
+            s = slice(start, start + BLOCK_ROWS)
+            trend += LinearFit.from_arrays(bmi[s], glucose[s])
+    return _from_acc(acc, trend, n)
+
+
+def _from_acc(acc: np.ndarray, trend: LinearFit, n: int) -> CohortStats:
+    total = acc.sum(axis=0)
+    sums, counts = acc[:, _SUMS::2], acc[:, _SUMS + 1::2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        overall = total[_SUMS::2] / total[_SUMS + 1::2]
+
+    rows = acc[:, _ROWS].astype(int)
+    return CohortStats(
+        total=n,
+        diabetic=int(rows[1]),
+        avg_glucose=float(overall[0]) if n else 0,
+        avg_bmi=float(overall[1]) if n else 0,
+        high_risk=int(total[_HIGH_RISK]),
+        high_glucose=int(total[_HIGH_GLUCOSE]),
+        obese=int(total[_OBESE]),
+        outcome_counts=(int(rows[0]), int(rows[1])),
+        outcome_means=tuple((o, tuple(float(x) for x in means[o]))
+                            for o in (0, 1) if rows[o]),
+        trend=trend,
+        acc=acc,
+    )
+
+
+def histogram(values, bins: int = 25, range_=None) -> tuple:
+    """Contagens por faixa calculadas no servidor (NaN/None descartados).
+
+    Devolve ``(counts, edges)`` como ``np.histogram``; só esses ``bins`` números
+    vão para o navegador, em vez de um valor por paciente.
+    """
+    v = pd.Series(values).to_numpy(dtype="float64", na_value=np.nan)
+    v = v[~np.isnan(v)]
+    if range_ is None and not len(v):
+        range_ = (0, 1)
+    counts, edges = np.histogram(v, bins=bins, range=range_)
+    return counts, edges
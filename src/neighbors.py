@@ -0,0 +1,132 @@
+"""Busca de pacientes semelhantes (k vizinhos mais próximos) no cohort.
+
+Força bruta vetorizada em blocos sobre as colunas clínicas padronizadas
+(z-score). Ausentes não impedem a comparação: a distância usa só as
+dimensões presentes nos dois pacientes e é reescalada para o total de
+dimensões (como ``nan_euclidean`` do scikit-learn)::
+
+    d²(x, q) = D / |presentes| · Σ_presentes (x_i − q_i)²
+
+A soma é expandida (x² − 2xq + q²) e calculada bloco a bloco com produtos
+matriciais; o índice guarda só os z-scores (float32) e um bitmap de presença.
+"""
+from typing import NamedTuple
+
+import numpy as np, pandas as pd
+
+NEIGHBOR_COLUMNS = ["Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI",
+                    "Age", "DiabetesPedigreeFunction"]
+
+BLOCK_ROWS = 1 << 18   # linhas do cohort por bloco de cálculo
+
+# Bits de cada valor de byte (256, 8), na ordem de ``np.packbits``
+_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float32)
+
+
+class Neighbors(NamedTuple):
+    rows: np.ndarray        # posições (iloc) no cohort, da mais próxima à mais distante
+    distances: np.ndarray
+
+
+class NeighborIndex:
+    def __init__(self, df: pd.DataFrame, columns=NEIGHBOR_COLUMNS):
+        self.columns = list(columns)
+        self.n, self.d = len(df), len(self.columns)
+        self.mean, self.std = np.empty(self.d), np.empty(self.d)
+        # Coluna a coluna, direto nos buffers finais: os temporários do tamanho
+        # do cohort são de uma coluna só
+        self._z = np.empty((self.n, self.d), dtype=np.float32)               # ausente = 0
+        self._present = np.zeros((self.n, (self.d + 7) // 8), dtype=np.uint8)  # bits de np.packbits
+        for j, col in enumerate(self.columns):
+            v = df[col].to_numpy(np.float64, na_value=np.nan, copy=True)   # alterada in-place
+            missing = np.isnan(v)
+            self.mean[j] = np.nanmean(v)
+            std = np.nanstd(v)
+            self.std[j] = std if std > 0 else 1.0
+            v -= self.mean[j]
+            v /= self.std[j]
+            v[missing] = 0
+            self._z[:, j] = v
+            self._present[:, j // 8] |= (~missing).view(np.uint8) << (7 - j % 8)
+
+    def standardize(self, values) -> np.ndarray:
+        """Valores clínicos (na ordem de ``columns``; ``None``/NaN = ausente) → z."""
+        return (np.asarray(values, dtype=np.float64) - self.mean) / self.std
+
+    def row(self, position: int) -> np.ndarray:
+        present = np.unpackbits(self._present[position], count=self.d).astype(bool)
+        return np.where(present, self._z[position].astype(np.float64), np.nan)
+
+    def _weights(self, z: np.ndarray) -> tuple:
+        """Pesos de ``[x² | x | presença] @ W`` para os pontos ``z`` (Q, D).
+
+        Colunas pares de ``W`` somam Σ(x−q)², ímpares as dimensões em comum.
+        A parte da presença vira uma tabela por byte do bitmap (256 × 2Q):
+        somar as linhas indexadas pelos bytes equivale ao produto.
+        """
+        m = ~np.isnan(z)
+        q = np.where(m, z, 0)
+        w = np.zeros((3 * self.d, 2 * len(z)), dtype=np.float32)
+        w[:self.d, 0::2] = m.T
+        w[self.d:2 * self.d, 0::2] = (-2 * q).T
+        w[2 * self.d:, 0::2] = (q * q).T
+        w[2 * self.d:, 1::2] = m.T
+        nbytes = self._present.shape[1]
+        wp = np.zeros((8 * nbytes, w.shape[1]), dtype=np.float32)
+        wp[:self.d] = w[2 * self.d:]
+        luts = [_BITS @ wp[8 * b:8 * b + 8] for b in range(nbytes)]
+        return w[:self.d], w[self.d:2 * self.d], luts
+
+    def _distances(self, start: int, weights: tuple) -> np.ndarray:
+        """Distâncias ``(bloco, Q)`` das linhas ``start:start + BLOCK_ROWS``."""
+        w_sq, w_x, luts = weights
+        x = self._z[start:start + BLOCK_ROWS]
+        out = (x * x) @ w_sq
+        out += x @ w_x
+        for b, lut in enumerate(luts):
+            out += np.take(lut, self._present[start:start + BLOCK_ROWS, b], axis=0)
+        sq, shared = out[:, 0::2], out[:, 1::2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d2 = np.where(shared > 0, np.maximum(sq, 0) * (self.d / shared), np.inf)
+        return np.sqrt(d2)
+
+    def distances(self, z) -> np.ndarray:
+        """Distância de cada linha do cohort ao ponto padronizado ``z`` (D,)."""
+        w = self._weights(np.asarray(z, dtype=np.float64)[None])
+        out = np.empty(self.n, dtype=np.float32)
+        for start in range(0, self.n, BLOCK_ROWS):
+            out[start:start + BLOCK_ROWS] = self._distances(start, w)[:, 0]
+        return out
+
+    def query(self, z, k: int = 10, exclude: int | None = None) -> Neighbors:
+        """Os ``k`` mais próximos de ``z``; ``exclude`` tira uma posição (o próprio paciente)."""
+        dist = self.distances(z)
+        if exclude is not None:
+            dist[exclude] = np.inf
+        k = min(k, self.n - (exclude is not None))
+        part = np.argpartition(dist, k - 1)[:k] if k < self.n else np.arange(self.n)
+        order = part[np.argsort(dist[part], kind="stable")]
+        return Neighbors(order, dist[order])
+
+    def query_patient(self, position: int, k: int = 10) -> Neighbors:
+        return self.query(self.row(position), k, exclude=position)
+
+    def query_batch(self, z, k: int = 10) -> Neighbors:
+        """Top-k para vários pontos ``z`` (Q, D), percorrendo o cohort em blocos."""
+        z = np.atleast_2d(np.asarray(z, dtype=np.float64))
+        w = self._weights(z)
+        k = min(k, self.n)
+        best_rows = np.empty((len(z), 0), dtype=np.int64)
+        best_dist = np.empty((len(z), 0), dtype=np.float32)
+        for start in range(0, self.n, BLOCK_ROWS):
+            d = self._distances(start, w).T   # (Q, bloco)
+            rows = np.concatenate([best_rows, np.broadcast_to(
+                np.arange(start, start + d.shape[1]), d.shape)], axis=1)
+            dist = np.concatenate([best_dist, d], axis=1)
+            keep = np.argpartition(dist, k - 1, axis=1)[:, :k] if dist.shape[1] > k \
+                else np.argsort(dist, axis=1)
+            best_rows = np.take_along_axis(rows, keep, 1)
+            best_dist = np.take_along_axis(dist, keep, 1)
+        order = np.argsort(best_dist, axis=1, kind="stable")
+        return Neighbors(np.take_along_axis(best_rows, order, 1),
+                         np.take_along_axis(best_dist, order, 1))
@@ -0,0 +1,87 @@
+"""Instrumentação opcional por rerun do dashboard.
+
+Ativação: ``DASHBOARD_PROFILE=1`` no ambiente ou ``?profile=1`` na URL. O painel
+com os últimos reruns só aparece para administradores: ``?admin=<token>`` igual
+a ``DASHBOARD_ADMIN_TOKEN``.
+"""
+import json, os, threading, time
+from collections import deque
+
+
+def profiling_enabled(query_params) -> bool:
+    return os.environ.get("DASHBOARD_PROFILE") == "1" or query_params.get("profile") == "1"
+
+
+def is_admin(query_params) -> bool:
+    token = os.environ.get("DASHBOARD_ADMIN_TOKEN")
+    return bool(token) and query_params.get("admin") == token
+
+
+class TraceStore:
+    """Buffer circular (compartilhado no processo) com os últimos ``maxlen`` reruns."""
+
+    def __init__(self, maxlen: int = 50):
+        self._traces = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, trace: dict):
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, n: int | None = None) -> list:
+        with self._lock:
+            traces = list(self._traces)
+        return traces[-n:] if n else traces
+
+    def export(self, path: str) -> int:
+        """Acrescenta os traces em ``path`` (JSON Lines); devolve quantos foram gravados."""
+        traces = self.recent()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as fh:
+            for trace in traces:
+                fh.write(json.dumps(trace, ensure_ascii=False) + "\n")
+        return len(traces)
+
+
+class Profiler:
+    """Cronômetro por seções nomeadas de um rerun.
+
+    ``lap(nome)`` encerra a seção corrente e abre a próxima, então basta uma
+    linha antes de cada bloco do script; desativado, tudo vira no-op.
+    """
+
+    def __init__(self, enabled: bool = False, store: TraceStore | None = None):
+        self.enabled = enabled
+        self.store = store
+        self.sections = {}
+        self.counters = {}
+        self._current = None
+        self._t0 = self._start = time.perf_counter()
+
+    def lap(self, name: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self.sections[self._current] = self.sections.get(self._current, 0.0) + now - self._t0
+        self._current, self._t0 = name, now
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def finish(self) -> dict | None:
+        """Fecha a última seção e registra o trace no ``store``."""
+        if not self.enabled:
+            return None
+        self.lap(None)
+        trace = {
+            "timestamp": time.time(),
+            "total_ms": (time.perf_counter() - self._start) * 1000,
+            "sections_ms": {k: v * 1000 for k, v in self.sections.items()},
+            "counters": dict(self.counters),
+        }
+        if self.store is not None:
+            self.store.add(trace)
+        self.enabled = False
+        return trace
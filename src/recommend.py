@@ -0,0 +1,181 @@
+"""Recomendação de alimentos por paciente: cohort × base de alimentos em lote.
+
+Uso::
+
+    python -m src.recommend data/diabetes.csv recomendacoes.parquet --top 10
+
+Cada alimento vira um vetor de atributos em percentis (orientados de modo
+que maior = melhor) e cada paciente um vetor de pesos derivado de
+``Glucose_Level``, ``BMI_Category``, ``BloodPressure`` e ``Risk_Score``; o
+score é o produto ``pesos @ atributos.T``. A matriz paciente × alimento é
+calculada em blocos de pacientes (memória limitada por ``BLOCK_CELLS``) e
+cada bloco vira um row group Parquet com o top-k em formato longo
+(``patient``, ``rank``, ``food``, ``score``).
+"""
+import argparse
+
+import numpy as np, pandas as pd
+
+from src.foods import FoodIndex
+from src.ingest import _prepare_block, _read_blocks, column_medians, write_parquet
+from src.utils import CATEGORY_DTYPES
+
+BLOCK_CELLS = 1 << 22   # células paciente × alimento por bloco (~32 MB em float64)
+
+PATIENT_COLUMNS = ["Glucose_Level", "BMI_Category", "BloodPressure", "Risk_Score"]
+
+# Atributo -> (coluna da base de alimentos, sinal): maior = melhor para o paciente
+FEATURES = {
+    "low_gl": ("Glycemic Load", -1),
+    "low_gi": ("Glycemic Index", -1),
+    "fiber": ("Fiber Content", 1),
+    "low_kcal": ("Calories", -1),
+    "protein": ("Percentual_Proteina", 1),
+    "low_sodium": ("Sodium Content", -1),
+    "potassium": ("Potassium Content", 1),
+    "bp_flag": ("Suitable for Blood Pressure", 1),
+    "diabetes_flag": ("Suitable for Diabetes", 1),
+}
+
+BASE_WEIGHTS = {"low_gl": 1, "low_gi": 0.5, "fiber": 0.5, "protein": 0.5,
+                "low_sodium": 0.3, "diabetes_flag": 0.5}
+
+# Pesos somados por categoria (ordem das categorias de CATEGORY_DTYPES)
+GLUCOSE_WEIGHTS = {
+    "Normal": {},
+    "Pré-diabetes": {"low_gl": 1, "low_gi": 0.5, "fiber": 0.5, "diabetes_flag": 0.5},
+    "Diabetes": {"low_gl": 2, "low_gi": 1, "fiber": 1, "diabetes_flag": 1},
+}
+BMI_WEIGHTS = {
+    "Baixo peso": {"low_kcal": -0.5, "protein": 0.5},
+    "Normal": {},
+    "Sobrepeso": {"low_kcal": 0.75},
+    "Obesidade": {"low_kcal": 1.5, "fiber": 0.5},
+}
+# Pressão diastólica (mmHg): limite inferior da faixa -> pesos somados
+BP_WEIGHTS = [
+    (80, {"low_sodium": 1, "potassium": 0.5, "bp_flag": 0.5}),
+    (90, {"low_sodium": 1, "potassium": 0.5, "bp_flag": 0.5}),
+]
+RISK_SCALED = ("low_gl", "low_gi", "fiber")   # multiplicados por 1 + Risk_Score / 8
+
+
+def _vector(weights: dict) -> np.ndarray:
+    return np.array([weights.get(k, 0.0) for k in FEATURES], dtype=np.float64)
+
+
+def _table(name: str, weights: dict) -> np.ndarray:
+    return np.stack([_vector(weights[c]) for c in CATEGORY_DTYPES[name].categories])
+
+
+def food_features(foods: pd.DataFrame) -> np.ndarray:
+    """Atributos ``(F, K)`` em percentis centrados (−0,5 a 0,5): valores extremos
+    (sementes com 30 g de fibra) não dominam o score. Ausentes viram 0."""
+    z = pd.DataFrame({k: foods[col].astype("float64") * sign
+                      for k, (col, sign) in FEATURES.items()}).rank(pct=True) - 0.5
+    return np.nan_to_num(z.to_numpy())
+
+
+def patient_weights(cohort: pd.DataFrame) -> np.ndarray:
+    """Pesos ``(P, K)`` montados por lookup dos códigos das categorias."""
+    w = _vector(BASE_WEIGHTS) \
+        + _table("Glucose_Level", GLUCOSE_WEIGHTS)[cohort["Glucose_Level"].cat.codes.to_numpy()] \
+        + _table("BMI_Category", BMI_WEIGHTS)[cohort["BMI_Category"].cat.codes.to_numpy()]
+    bp = cohort["BloodPressure"].to_numpy(np.float64, na_value=np.nan)
+    for lower, weights in BP_WEIGHTS:
+        w += np.outer(bp >= lower, _vector(weights))   # NaN nunca entra na faixa
+    scaled = np.isin(list(FEATURES), RISK_SCALED)
+    risk = cohort["Risk_Score"].to_numpy(np.float64, na_value=0)
+    w[:, scaled] *= (1 + np.clip(risk, 0, None) / 8)[:, None]
+    return w
+
+
+class Recommender:
+    def __init__(self, foods: FoodIndex):
+        self.foods = foods.df.drop_duplicates("Food Name").reset_index(drop=True)
+        self._features = food_features(self.foods)
+        self._diabetes_ok = self.foods["Suitable for Diabetes"].to_numpy(bool)
+        self._names = pd.Categorical(self.foods["Food Name"].astype(str))
+
+    def top_k(self, cohort: pd.DataFrame, k: int = 10):
+        """``(índices (P, k), scores (P, k))`` em ordem decrescente de score.
+
+        Pacientes com ``Glucose_Level == "Diabetes"`` só recebem alimentos
+        marcados como adequados para diabetes.
+        """
+        k = min(k, len(self.foods))
+        scores = patient_weights(cohort) @ self._features.T
+        diabetic = (cohort["Glucose_Level"] == "Diabetes").to_numpy(bool)
+        scores[np.ix_(diabetic, ~self._diabetes_ok)] = -np.inf
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, 1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        return np.take_along_axis(part, order, 1), np.take_along_axis(part_scores, order, 1)
+
+    def recommend(self, cohort: pd.DataFrame, k: int = 10, offset: int = 0) -> pd.DataFrame:
+        """Top-k em formato longo; ``patient`` é a posição no cohort (+ ``offset``)."""
+        idx, scores = self.top_k(cohort, k)
+        P, k = idx.shape
+        return pd.DataFrame({
+            "patient": np.repeat(np.arange(offset, offset + P, dtype=np.int64), k),
+            "rank": np.tile(np.arange(1, k + 1, dtype=np.int8), P),
+            "food": pd.Categorical.from_codes(self._names.codes[idx.ravel()],
+                                              categories=self._names.categories),
+            "score": scores.ravel().astype(np.float32),
+        })
+
+    def block_rows(self) -> int:
+        return max(1, BLOCK_CELLS // len(self.foods))
+
+
+def _cohort_blocks(path: str, rows: int):
+    """Blocos do cohort preparado: store Parquet (``src.ingest``) ou CSV bruto."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=rows, columns=PATIENT_COLUMNS):
+            yield batch.to_pandas().astype({c: CATEGORY_DTYPES[c] for c in PATIENT_COLUMNS[:2]})
+    else:
+        medians = column_medians(path, rows)
+        for block in _read_blocks(path, rows):
+            yield _prepare_block(block, medians)[PATIENT_COLUMNS]
+
+
+def recommend_file(src: str, dest: str, foods: str = "data/pred_food.csv", k: int = 10) -> dict:
+    """Recomendações do cohort ``src`` inteiro gravadas em ``dest`` (Parquet).
+
+    Pico de memória: um bloco de pacientes e sua matriz de scores. Devolve
+    ``{"patients": ..., "rows": ..., "row_groups": ...}``.
+    """
+    import pyarrow as pa
+
+    rec = Recommender(FoodIndex.load(foods))
+    patients = 0
+
+    def tables():
+        nonlocal patients
+        for block in _cohort_blocks(src, rec.block_rows()):
+            table = rec.recommend(block, k, offset=patients)
+            patients += len(block)
+            yield pa.Table.from_pandas(table, preserve_index=False)
+
+    groups = write_parquet(dest, tables())
+    if not groups:
+        raise ValueError(f"{src} não contém linhas")
+    return {"patients": patients, "rows": patients * min(k, len(rec.foods)), "row_groups": groups}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recomendação de alimentos em lote para o cohort")
+    parser.add_argument("src", help="CSV bruto ou store Parquet de src.ingest")
+    parser.add_argument("dest")
+    parser.add_argument("--foods", default="data/pred_food.csv")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+    info = recommend_file(args.src, args.dest, args.foods, args.top)
+    print(f"{info['patients']} pacientes, {info['rows']} recomendações em "
+          f"{info['row_groups']} blocos → {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np, pandas as pd
+
+OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+class Rule(NamedTuple):
+    column: str
+    op: str          # chave de OPERATORS
+    threshold: float
+    weight: int
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Tabela versionada de regras; o score é a soma dos pesos das regras atendidas."""
+    name: str
+    version: int
+    rules: tuple
+
+    @property
+    def key(self) -> str:
+        return f"{self.name} v{self.version}"
+
+    @property
+    def max_score(self) -> int:
+        return sum(r.weight for r in self.rules if r.weight > 0)
+
+
+# Regra original do dashboard (Glicose > 125, IMC > 30, Idade > 45, PA > 140)
+DEFAULT_RULES = RuleSet("Padrão", 1, (
+    Rule("Glucose", ">", 125, 3),
+    Rule("BMI", ">", 30, 2),
+    Rule("Age", ">", 45, 1),
+    Rule("BloodPressure", ">", 140, 2),
+))
+
+# Rastreamento mais sensível: pré-diabetes, sobrepeso e histórico familiar pontuam
+SCREENING_RULES = RuleSet("Rastreamento ampliado", 1, (
+    Rule("Glucose", ">=", 100, 2),
+    Rule("Glucose", ">=", 126, 1),
+    Rule("BMI", ">=", 25, 1),
+    Rule("BMI", ">=", 30, 1),
+    Rule("Age", ">=", 45, 1),
+    Rule("BloodPressure", ">=", 130, 1),
+    Rule("DiabetesPedigreeFunction", ">", 0.5, 1),
+))
+
+RULE_SETS = {rs.key: rs for rs in (DEFAULT_RULES, SCREENING_RULES)}
+
+
+def _values(df: pd.DataFrame, col: str) -> np.ndarray:
+    # Colunas numpy (float32/int8...) são lidas sem cópia; nullable/object viram float com NaN
+    values = df[col].to_numpy()
+    if values.dtype.kind not in "iuf":
+        values = df[col].to_numpy(dtype="float64", na_value=np.nan)
+    return values
+
+
+def risk_score(df: pd.DataFrame, rules: RuleSet = DEFAULT_RULES) -> np.ndarray:
+    """Avalia ``rules`` sobre ``df`` e devolve o score (int16), uma posição por linha.
+
+    Um único buffer booleano é reutilizado por todas as comparações e os pesos
+    são somados in-place com ``where=``; valores ausentes (NaN) nunca pontuam.
+    """
+    n = len(df)
+    score = np.zeros(n, dtype="int16")
+    hit = np.empty(n, dtype=bool)
+    for rule in rules.rules:
+        OPERATORS[rule.op](_values(df, rule.column), rule.threshold, out=hit)
+        np.add(score, rule.weight, out=score, where=hit)
+    return score
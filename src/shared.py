@@ -0,0 +1,117 @@
+"""Cohort preparado compartilhado entre sessões e processos via Arrow mapeado em memória.
+
+O primeiro processo que prepara uma versão do dataset a publica como arquivo
+Arrow IPC (sem compressão) em ``SHARED_DIR`` (``/dev/shm`` quando existe);
+os demais apenas mapeiam o arquivo (``pa.memory_map``) somente leitura. As
+colunas numéricas viram arrays NumPy apontando para as páginas compartilhadas
+(sem cópia); só os códigos das categorias (1 byte/linha) são copiados.
+
+O nome do arquivo inclui ``PIPELINE_VERSION`` (``/dev/shm`` sobrevive a
+deploys, e um processo com outro código de preparo não reaproveita o cohort)
+e a chave da fonte (``source_key``). Ao publicar, só as versões antigas da
+mesma fonte e do mesmo pipeline são removidas: réplicas de outro deploy e
+outras fontes no mesmo host não apagam os arquivos umas das outras. Arquivos
+de qualquer outro par parados há mais de ``SHARED_MAX_AGE`` segundos também
+saem.
+"""
+import hashlib, json, os, tempfile, time
+
+import pandas as pd
+
+from src.utils import PIPELINE_VERSION, MemoryReport
+
+SHARED_DIR = os.environ.get("DASHBOARD_SHARED_DIR") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "dashboard-diabetes")
+SHARED_MAX_AGE = 7 * 24 * 3600   # arquivos de outros deploys/fontes sem republicação
+
+
+def source_key(source: str) -> str:
+    """Chave curta do caminho da fonte (``""`` = sem fonte)."""
+    return hashlib.blake2b(os.path.abspath(source).encode(), digest_size=4).hexdigest() \
+        if source else "0" * 8
+
+
+def _prefix(source: str) -> str:
+    return f"cohort-{PIPELINE_VERSION}-{source_key(source)}-"
+
+
+def shared_path(version: str, source: str = "", directory: str = SHARED_DIR) -> str:
+    return os.path.join(directory, f"{_prefix(source)}{version}.arrow")
+
+
+def _to_arrow(df: pd.DataFrame, report: MemoryReport | None):
+    import pyarrow as pa
+
+    arrays = []
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes = s.cat.codes.to_numpy()
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0), pa.array(list(s.cat.categories)),
+                ordered=s.cat.ordered))
+        elif isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+            arrays.append(pa.array(s))                  # nullable Int8/Int16: máscara Arrow
+        else:
+            arrays.append(pa.array(s.to_numpy()))       # NaN continua NaN (não vira null)
+    metadata = {"memory_report": json.dumps(report._asdict())} if report else None
+    return pa.Table.from_arrays(arrays, names=list(df.columns), metadata=metadata)
+
+
+def publish(df: pd.DataFrame, version: str, report: MemoryReport | None = None,
+            source: str = "", directory: str = SHARED_DIR) -> str:
+    """Grava o cohort da ``version`` de ``source`` e remove as versões antigas da
+    mesma fonte e pipeline (quem já as mapeou continua lendo normalmente: o
+    arquivo só some quando o último mapa fecha)."""
+    import pyarrow as pa
+
+    os.makedirs(directory, exist_ok=True)
+    path = shared_path(version, source, directory)
+    table = _to_arrow(df, report)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as fh, pa.ipc.new_file(fh, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)   # leitores nunca veem arquivo parcial
+    prefix, now = _prefix(source), time.time()
+    for name in os.listdir(directory):
+        old = os.path.join(directory, name)
+        if not name.startswith("cohort-") or not name.endswith(".arrow") or old == path:
+            continue
+        try:
+            if name.startswith(prefix) or now - os.path.getmtime(old) > SHARED_MAX_AGE:
+                os.remove(old)
+        except FileNotFoundError:   # outro processo limpou antes
+            pass
+    return path
+
+
+def attach(version: str, source: str = "", directory: str = SHARED_DIR):
+    """Mapeia a versão publicada; ``(df, report)`` ou ``None`` se não existir."""
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_file(pa.memory_map(shared_path(version, source, directory))).read_all()
+    except FileNotFoundError:
+        return None
+    meta = (table.schema.metadata or {}).get(b"memory_report")
+    report = MemoryReport(**json.loads(meta)) if meta else None
+    return table.to_pandas(split_blocks=True), report
+
+
+def shared_frame(version: str, build, source: str = "", directory: str = SHARED_DIR):
+    """Anexa a versão publicada ou chama ``build() -> (df, report)`` e publica.
+
+    Sem ``pyarrow`` ou sem diretório gravável, devolve o resultado de ``build``.
+    """
+    try:
+        found = attach(version, source, directory)
+    except (ImportError, OSError):
+        return build()
+    if found is not None:
+        return found
+    df, report = build()
+    try:
+        publish(df, version, report, source, directory)
+        return attach(version, source, directory) or (df, report)
+    except OSError:
+        return df, report
@@ -0,0 +1,242 @@
+"""Fontes dos datasets: arquivo local, mirror offline endereçado por conteúdo e
+fontes remotas (KaggleHub, URL), consultadas em ordem.
+
+O caminho de requisição (``dataset_path``) só usa fontes locais e falha
+rápido; a rede fica restrita ao pré-carregamento do mirror::
+
+    python -m src.sources prefetch                     # KaggleHub → mirror
+    python -m src.sources prefetch --url file:///media/pendrive/datasets
+    python -m src.sources verify
+
+O mirror guarda cada arquivo uma vez em ``blobs/<sha256>`` (gravação atômica,
+hash conferido na escrita e na leitura) e ``refs/<nome>`` aponta para o hash
+da versão atual. ``DASHBOARD_MIRROR_DIR`` troca o diretório padrão.
+"""
+import argparse, hashlib, os, shutil, tempfile
+from typing import NamedTuple
+from urllib.parse import urljoin
+from urllib.request import urlopen
+
+MIRROR_DIR = os.environ.get("DASHBOARD_MIRROR_DIR") or os.path.join("data", ".mirror")
+_DOWNLOAD_PREFIX = "dataset-download-"   # arquivos temporários de UrlSource
+
+
+class DatasetRef(NamedTuple):
+    filename: str
+    sha256: str | None = None   # versão fixada; None = a apontada por refs/<filename>
+    kaggle: str | None = None   # handle do KaggleHub
+
+
+DATASETS = {
+    "diabetes": DatasetRef(
+        "diabetes.csv",
+        "b78029447fae2743b3218bb2b76ef0d04afe8d7e55ce2faf4d1ec82d8f8ae8ac",
+        "uciml/pima-indians-diabetes-database"),
+    "foods": DatasetRef(
+        "pred_food.csv",
+        "f8afbf9e137255613db779d204d74447f9e6406a0d80f156cbd86fe5433e108f"),
+}
+
+
+class ChecksumError(ValueError):
+    pass
+
+
+class SourceUnavailable(FileNotFoundError):
+    pass
+
+
+def sha256_file(path: str, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class LocalSource:
+    """Arquivo num caminho fixo (o ``data/`` do projeto). Conteúdo livre: o
+    arquivo local pode ser uma versão mais nova que a fixada em ``DatasetRef``."""
+    remote = False
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self, ref: DatasetRef) -> str | None:
+        return self.path if os.path.isfile(self.path) else None
+
+    def __repr__(self):
+        return f"LocalSource({self.path!r})"
+
+
+class MirrorSource:
+    """Mirror offline endereçado por conteúdo."""
+    remote = False
+
+    def __init__(self, root: str = MIRROR_DIR):
+        self.root = root
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest)
+
+    def ref_path(self, filename: str) -> str:
+        return os.path.join(self.root, "refs", filename)
+
+    def digest_for(self, ref: DatasetRef) -> str | None:
+        if ref.sha256:
+            return ref.sha256
+        try:
+            with open(self.ref_path(ref.filename)) as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def fetch(self, ref: DatasetRef) -> str | None:
+        digest = self.digest_for(ref)
+        if digest is None:
+            return None
+        path = self.blob_path(digest)
+        if not os.path.isfile(path):
+            return None
+        if sha256_file(path) != digest:
+            raise ChecksumError(f"blob corrompido no mirror: {path}")
+        return path
+
+    def store(self, ref: DatasetRef, src: str) -> str:
+        """Copia ``src`` para o mirror (conferindo ``ref.sha256``) e atualiza a ref."""
+        digest = sha256_file(src)
+        if ref.sha256 and digest != ref.sha256:
+            raise ChecksumError(f"{ref.filename}: sha256 {digest} ≠ esperado {ref.sha256}")
+        blob = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if not os.path.isfile(blob) or sha256_file(blob) != digest:   # ausente ou corrompido
+            _atomic_copy(src, blob)
+        os.makedirs(os.path.dirname(self.ref_path(ref.filename)), exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(self.ref_path(ref.filename)),
+                                         delete=False) as fh:
+            fh.write(digest)
+        os.replace(fh.name, self.ref_path(ref.filename))
+        return digest
+
+    def __repr__(self):
+        return f"MirrorSource({self.root!r})"
+
+
+class KaggleSource:
+    """KaggleHub (rede). ``download`` é injetável: testes usam um substituto local."""
+    remote = True
+
+    def __init__(self, download=None):
+        self.download = download
+
+    def fetch(self, ref: DatasetRef) -> str | None:
+        if not ref.kaggle:
+            return None
+        download = self.download
+        if download is None:
+            import kagglehub  # dependência opcional, só no prefetch
+            download = kagglehub.dataset_download
+        path = os.path.join(download(ref.kaggle), ref.filename)
+        return path if os.path.isfile(path) else None
+
+    def __repr__(self):
+        return "KaggleSource()"
+
+
+class UrlSource:
+    """Diretório remoto ``<base_url>/<filename>``. Aceita ``file://``, o que torna
+    qualquer pasta local um substituto do servidor em testes e air-gap."""
+    remote = True
+
+    def __init__(self, base_url: str, timeout: float = 30.0, cache_dir: str | None = None):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.timeout = timeout
+        self.cache_dir = cache_dir or tempfile.gettempdir()
+
+    def fetch(self, ref: DatasetRef) -> str | None:
+        dest = os.path.join(self.cache_dir, f"{_DOWNLOAD_PREFIX}{os.getpid()}-{ref.filename}")
+        try:
+            with urlopen(urljoin(self.base_url, ref.filename), timeout=self.timeout) as resp, \
+                    open(dest, "wb") as fh:
+                shutil.copyfileobj(resp, fh)
+        except BaseException:
+            if os.path.exists(dest):
+                os.remove(dest)
+            raise
+        return dest
+
+    def __repr__(self):
+        return f"UrlSource({self.base_url!r})"
+
+
+def _atomic_copy(src: str, dest: str):
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+def resolve(ref: DatasetRef, sources, allow_remote: bool = False) -> str:
+    """Primeiro caminho disponível entre ``sources``, na ordem dada.
+
+    Fontes remotas são puladas sem ``allow_remote``; uma fonte que falha
+    (ausente, erro, checksum) não interrompe a busca nas seguintes. Sem
+    nenhuma, levanta ``SourceUnavailable`` com o motivo de cada fonte.
+    """
+    reasons = []
+    for source in sources:
+        if source.remote and not allow_remote:
+            reasons.append(f"{source!r}: remota (desativada)")
+            continue
+        try:
+            path = source.fetch(ref)
+        except Exception as e:
+            reasons.append(f"{source!r}: {e}")
+            continue
+        if path:
+            return path
+        reasons.append(f"{source!r}: ausente")
+    raise SourceUnavailable(f"{ref.filename} indisponível — " + "; ".join(reasons))
+
+
+def local_sources(local_path: str | None, mirror: str = MIRROR_DIR) -> list:
+    """Ordem do caminho de requisição: arquivo local, depois o mirror (sem rede)."""
+    return ([LocalSource(local_path)] if local_path else []) + [MirrorSource(mirror)]
+
+
+def prefetch(ref: DatasetRef, mirror: MirrorSource, sources) -> str:
+    """Baixa ``ref`` da primeira fonte (remota ou não) e grava no mirror."""
+    path = resolve(ref, sources, allow_remote=True)
+    try:
+        return mirror.store(ref, path)
+    finally:
+        if os.path.basename(path).startswith(_DOWNLOAD_PREFIX):
+            os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mirror offline dos datasets do dashboard")
+    parser.add_argument("command", choices=["prefetch", "verify"])
+    parser.add_argument("datasets", nargs="*", default=list(DATASETS), help=f"{list(DATASETS)}")
+    parser.add_argument("--mirror", default=MIRROR_DIR)
+    parser.add_argument("--url", help="diretório remoto (http://, https:// ou file://)")
+    parser.add_argument("--local", default="data", help="pasta com cópias locais (fonte inicial)")
+    args = parser.parse_args(argv)
+
+    mirror, failed = MirrorSource(args.mirror), 0
+    for name in args.datasets:
+        ref = DATASETS[name]
+        try:
+            if args.command == "verify":
+                print(f"{ref.filename}: ok ({resolve(ref, [mirror])})")
+                continue
+            sources = [LocalSource(os.path.join(args.local, ref.filename))]
+            sources += [UrlSource(args.url)] if args.url else [KaggleSource()]
+            print(f"{ref.filename}: {prefetch(ref, mirror, sources)}")
+        except (SourceUnavailable, ChecksumError) as e:
+            failed += 1
+            print(f"{ref.filename}: ERRO — {e}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import numpy as np, pandas as pd, pytest
+
+from src.bench import synthetic_cohort
+from src.dataset import DatasetStore, build_snapshot
+from src.engine import CohortEngine, prepare_cohort, result_payload
+from src.ingest import read_shards, shard_paths
+from src.risk import SCREENING_RULES
+
+FILTERS = [
+    {},
+    dict(age_range=(30, 60), glucose_range=(90, 160)),
+    dict(bmi_categories=("Normal", "Sobrepeso"), risk_level="Moderado (3-5)"),
+    dict(age_groups=("31-45", "46-60"), rules=SCREENING_RULES.key),
+]
+
+
+def assert_same(a, b):
+    """Payloads iguais (floats com tolerância: a ordem das somas muda)."""
+    if isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for k in a:
+            assert_same(a[k], b[k])
+    elif isinstance(a, (list, tuple)):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            assert_same(x, y)
+    elif isinstance(a, float):
+        assert a == pytest.approx(b, rel=1e-9, nan_ok=True)
+    else:
+        assert a == b
+
+
+def check_append(old_raw: pd.DataFrame, new_raw: pd.DataFrame):
+    engine = CohortEngine(prepare_cohort(old_raw))
+    filters = [engine.default_filter(**f) for f in FILTERS]
+    for f in filters:   # índices e recortes em cache, para o append estender
+        engine.query(f)
+    appended = engine.append(new_raw)
+    rebuilt = CohortEngine(prepare_cohort(pd.concat([old_raw, new_raw], ignore_index=True)))
+
+    pd.testing.assert_frame_equal(appended.base, rebuilt.base)
+    for f in filters:
+        a, b = appended.query(f), rebuilt.query(f)
+        np.testing.assert_array_equal(a.rows, b.rows)
+        assert_same(result_payload(a), result_payload(b))
+    return appended
+
+
+def test_append_matches_rebuild():
+    check_append(synthetic_cohort(3000, seed=1), synthetic_cohort(700, seed=2))
+
+
+def test_append_relabels_when_median_changes_bin():
+    old = synthetic_cohort(2000, seed=3)
+    old["Glucose"] = np.where(np.arange(2000) % 10 == 0, 0, 90)   # mediana 90: "Normal"
+    new = synthetic_cohort(3000, seed=4)
+    new["Glucose"] = 150                                          # mediana 150: "Diabetes"
+    appended = check_append(old, new)
+    missing = old["Glucose"].to_numpy() == 0
+    assert (appended.base["Glucose_Level"][:2000][missing] == "Diabetes").all()
+
+
+def test_store_appends_new_shards(tmp_path):
+    synthetic_cohort(1500, seed=5).to_csv(tmp_path / "a.csv", index=False)
+    loads = []
+
+    def loader(path, version):
+        loads.append(version)
+        return build_snapshot(read_shards(shard_paths(path)), version, path)
+
+    store = DatasetStore(str(tmp_path), loader=loader)
+    store.current()
+    synthetic_cohort(500, seed=6).to_csv(tmp_path / "b.csv", index=False)
+    assert store.refresh()
+    assert len(loads) == 1   # só o shard novo foi lido
+    expected = prepare_cohort(read_shards(shard_paths(str(tmp_path))))
+    pd.testing.assert_frame_equal(store.current().engine.base, expected)
+
+    synthetic_cohort(100, seed=7).to_csv(tmp_path / "a.csv", index=False)
+    assert store.refresh()
+    assert len(loads) == 2   # shard antigo alterado: recarga completa
+    store.stop()
@@ -0,0 +1,8 @@
+from src.bench import synthetic_cohort
+
+
+def test_synthetic_diabetics_have_higher_glucose_and_bmi():
+    df = synthetic_cohort(20_000, seed=0)
+    means = df[df["Glucose"] > 0].groupby("Outcome")[["Glucose", "BMI"]].mean()
+    assert means.loc[1, "Glucose"] > means.loc[0, "Glucose"] + 20
+    assert means.loc[1, "BMI"] > means.loc[0, "BMI"]
@@ -0,0 +1,78 @@
+import hashlib
+
+import pytest
+
+from src.sources import (ChecksumError, DatasetRef, KaggleSource, LocalSource, MirrorSource,
+                         SourceUnavailable, UrlSource, local_sources, prefetch, resolve)
+
+CONTENT = b"Glucose,BMI,Outcome\n148,33.6,1\n85,26.6,0\n"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """Pasta local no papel do servidor remoto."""
+    folder = tmp_path / "remote"
+    folder.mkdir()
+    (folder / "cohort.csv").write_bytes(CONTENT)
+    return folder
+
+
+def test_prefetch_from_file_url(tmp_path, remote):
+    mirror = MirrorSource(str(tmp_path / "mirror"))
+    ref = DatasetRef("cohort.csv", DIGEST)
+    assert prefetch(ref, mirror, [UrlSource(remote.as_uri(), cache_dir=str(tmp_path))]) == DIGEST
+    with open(resolve(ref, [mirror]), "rb") as fh:
+        assert fh.read() == CONTENT
+    assert resolve(DatasetRef("cohort.csv"), [mirror]) == mirror.blob_path(DIGEST)   # via refs/
+    assert not list(tmp_path.glob("dataset-download-*"))   # download temporário removido
+
+
+def test_prefetch_rejects_wrong_checksum(tmp_path, remote):
+    mirror = MirrorSource(str(tmp_path / "mirror"))
+    with pytest.raises(ChecksumError):
+        prefetch(DatasetRef("cohort.csv", "0" * 64), mirror,
+                 [UrlSource(remote.as_uri(), cache_dir=str(tmp_path))])
+    assert not (tmp_path / "mirror").exists()
+    assert not list(tmp_path.glob("dataset-download-*"))
+
+
+def test_corrupted_blob_raises_and_is_repaired(tmp_path, remote):
+    mirror = MirrorSource(str(tmp_path / "mirror"))
+    ref = DatasetRef("cohort.csv", DIGEST)
+    mirror.store(ref, str(remote / "cohort.csv"))
+    with open(mirror.blob_path(DIGEST), "ab") as fh:
+        fh.write(b"lixo")
+    with pytest.raises(ChecksumError):
+        mirror.fetch(ref)
+    with pytest.raises(SourceUnavailable, match="corrompido"):
+        resolve(ref, [mirror])
+    mirror.store(ref, str(remote / "cohort.csv"))   # novo prefetch reescreve o blob
+    assert mirror.fetch(ref) == mirror.blob_path(DIGEST)
+
+
+def test_request_path_skips_remote_sources(tmp_path, remote):
+    calls = []
+
+    def download(handle):
+        calls.append(handle)
+        return str(remote)
+
+    ref = DatasetRef("cohort.csv", DIGEST, kaggle="org/cohort")
+    sources = local_sources(str(tmp_path / "ausente.csv"), str(tmp_path / "mirror")) + \
+        [KaggleSource(download)]
+    with pytest.raises(SourceUnavailable, match="remota"):
+        resolve(ref, sources)
+    assert calls == []
+    assert resolve(ref, sources, allow_remote=True) == str(remote / "cohort.csv")
+    assert calls == ["org/cohort"]
+
+
+def test_resolve_uses_first_available_source(tmp_path, remote):
+    mirror = MirrorSource(str(tmp_path / "mirror"))
+    ref = DatasetRef("cohort.csv", DIGEST)
+    mirror.store(ref, str(remote / "cohort.csv"))
+    local = LocalSource(str(remote / "cohort.csv"))
+    assert resolve(ref, [local, mirror]) == local.path
+    assert resolve(ref, [LocalSource(str(tmp_path / "ausente.csv")), mirror]) == \
+        mirror.blob_path(DIGEST)
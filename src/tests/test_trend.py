@@ -0,0 +1,26 @@
+import numpy as np, pytest
+
+from src.bench import synthetic_cohort
+from src.engine import CohortEngine, prepare_cohort
+from src.metrics import LinearFit
+from src.risk import SCREENING_RULES
+
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    dict(age_range=(30, 60), glucose_range=(90, 160)),
+    dict(bmi_categories=("Obesidade",), risk_level="Moderado (3-5)"),
+    dict(age_groups=("18-30",), rules=SCREENING_RULES.key),
+])
+def test_bucket_trend_matches_rows(overrides):
+    engine = CohortEngine(prepare_cohort(synthetic_cohort(4000, seed=8)))
+    f = engine.default_filter(**overrides)
+    result = engine.query(f)
+    cohort = engine.scored(f.rules).iloc[result.rows]
+    expected = LinearFit.from_arrays(cohort["BMI"].to_numpy("float64", na_value=np.nan),
+                                     cohort["Glucose"].to_numpy("float64", na_value=np.nan))
+    trend = result.stats.trend
+    assert expected.n > 0 and trend.n == expected.n
+    assert (trend.xmin, trend.xmax) == (expected.xmin, expected.xmax)
+    assert trend.slope == pytest.approx(expected.slope, rel=1e-9)
+    assert trend.intercept == pytest.approx(expected.intercept, rel=1e-9)
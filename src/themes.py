@@ -0,0 +1,107 @@
+"""Temas dos gráficos: templates Plotly compilados e esqueletos de figura.
+
+Cada tema do seletor "Tema dos Gráficos" vira um ``go.layout.Template``
+registrado em ``plotly.io.templates`` na importação (``template_name``). As
+figuras do dashboard são montadas a partir de esqueletos: a figura validada
+uma vez por (gráfico, tema), com layout e estilo dos traces mas sem dados,
+guardada serializada (``skeleton``). A cada rerun só os arrays de dados mudam
+e ``from_skeleton`` monta a figura sem revalidar layout, linhas de referência
+e template (ver os estágios ``figure.*`` de ``src.bench``).
+"""
+from typing import NamedTuple
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+
+class ChartTheme(NamedTuple):
+    palette: dict           # cores nomeadas usadas pelos gráficos (primary, light, ...)
+    text: str
+    background: str
+    grid: str
+    font_size: int = 12
+    line_width: int = 1     # eixos e contornos
+    base: str = "plotly_white"
+
+
+DIABETES_PALETTE = {
+    'primary': '#3674B5',      # Azul principal
+    'secondary': '#578FCA',    # Azul secundário
+    'light': '#A1E3F9',        # Azul claro
+    'lighter': '#D1F8EF',      # Azul muito claro
+    'dark': '#2563EB',         # Azul escuro
+    'accent': '#1E40AF',       # Azul acentuado
+    'success': '#10B981',      # Verde para dados positivos
+    'warning': '#F59E0B',      # Amarelo para alertas
+    'danger': '#EF4444',       # Vermelho para riscos
+}
+
+THEMES = {
+    'Diabetes Blue': ChartTheme(DIABETES_PALETTE, text='#1e293b', background='white',
+                                grid='#e2e8f0'),
+    'Professional': ChartTheme({
+        'primary': '#1F3A5F', 'secondary': '#4A6FA5', 'light': '#A7B8CC',
+        'lighter': '#E2E8F0', 'dark': '#0F172A', 'accent': '#B45309',
+        'success': '#15803D', 'warning': '#B45309', 'danger': '#B91C1C',
+    }, text='#0f172a', background='white', grid='#e5e7eb'),
+    # Cores Okabe-Ito (seguras para daltonismo), texto preto e linhas grossas
+    'High Contrast': ChartTheme({
+        'primary': '#0033CC', 'secondary': '#0072B2', 'light': '#E69F00',
+        'lighter': '#F0E442', 'dark': '#000000', 'accent': '#D55E00',
+        'success': '#009E73', 'warning': '#E69F00', 'danger': '#CC0000',
+    }, text='#000000', background='white', grid='#8c8c8c', font_size=14, line_width=2,
+        base='simple_white'),
+}
+DEFAULT_THEME = 'Diabetes Blue'
+
+
+def template_name(theme: str) -> str:
+    return "dashboard_" + theme.lower().replace(" ", "_")
+
+
+def build_template(theme: ChartTheme) -> go.layout.Template:
+    p = theme.palette
+    axis = dict(gridcolor=theme.grid, linecolor=theme.text, linewidth=theme.line_width,
+                zerolinecolor=theme.grid, tickcolor=theme.text, title_standoff=8)
+    template = go.layout.Template(pio.templates[theme.base])
+    template.layout.update(
+        font=dict(color=theme.text, size=theme.font_size),
+        paper_bgcolor=theme.background,
+        plot_bgcolor=theme.background,
+        colorway=[p['primary'], p['light'], p['secondary'], p['success'], p['warning'],
+                  p['danger'], p['accent']],
+        xaxis=axis, yaxis=axis,
+        legend=dict(bgcolor="rgba(0,0,0,0)"),
+        hoverlabel=dict(font_size=theme.font_size),
+        margin=dict(t=40, r=20, b=40, l=20),
+    )
+    template.data.pie = [go.Pie(marker_line=dict(color=theme.background, width=theme.line_width))]
+    return template
+
+
+for _name, _theme in THEMES.items():
+    pio.templates[template_name(_name)] = build_template(_theme)
+
+
+def get_theme(name: str) -> ChartTheme:
+    return THEMES.get(name, THEMES[DEFAULT_THEME])
+
+
+def skeleton(fig: go.Figure) -> dict:
+    """Figura (validada, sem arrays de dados) → esqueleto serializado."""
+    return fig.to_dict()
+
+
+def from_skeleton(skel: dict, data=(), traces=(), **layout) -> go.Figure:
+    """Figura a partir de ``skel`` sem revalidação.
+
+    ``data`` tem um dict por trace do esqueleto, na ordem, só com chaves de
+    primeiro nível (``x``, ``y``, ``values``, ``text``...); ``traces`` (objetos
+    ``go`` já validados) entram depois; ``layout`` substitui chaves de primeiro
+    nível do layout. O esqueleto não é alterado.
+    """
+    return go.Figure({
+        "data": [{**t, **d} for t, d in zip(skel["data"], data, strict=True)]
+                + [t.to_plotly_json() for t in traces],
+        "layout": {**skel["layout"], **layout},
+    }, _validate=False)
@@ -1,30 +1,186 @@
-import os, pandas as pd, streamlit as st
-import kagglehub
+import os, re, hashlib, logging, pandas as pd
+from typing import NamedTuple
 
-@st.cache_data(show_spinner=False)
-def load_csv(local_path: str = None,
-             fallback_kaggle: str = None,
-             fallback_filename: str | None = None) -> pd.DataFrame:
-    """Carrega CSV (local > KaggleHub > upload manual)."""
-    if local_path and os.path.exists(local_path):
-        return pd.read_csv(local_path)
+from src.risk import DEFAULT_RULES, risk_score
 
-    if fallback_kaggle and fallback_filename:
-        try:
-            path = kagglehub.dataset_download(fallback_kaggle)
-            return pd.read_csv(os.path.join(path, fallback_filename))
-        except Exception as e:
-            st.info(f"⚠️ Erro no download do Kaggle – {e}")
+# Tipos explícitos do esquema Pima (aplicados no CSV e no arquivo colunar)
+CSV_DTYPES = {
+    "Pregnancies": "int8",
+    "Outcome": "int8",
+    "BMI": "float32",
+    "DiabetesPedigreeFunction": "float32",
+}
 
-    up = st.sidebar.file_uploader("📤 Faça upload do CSV", ["csv"])
-    if up: return pd.read_csv(up)
+COLUMNAR_DIR = ".columnar"   # subpasta (ao lado do CSV) com os sidecars Parquet
 
-    st.stop()  # encerra o script se nada foi encontrado
+
+def fingerprint(path: str, sample: int = 1 << 16) -> str:
+    """Chave do sidecar: tamanho + mtime + hash do início do arquivo."""
+    st_ = os.stat(path)
+    h = hashlib.blake2b(f"{st_.st_size}:{st_.st_mtime_ns}".encode(), digest_size=8)
+    with open(path, "rb") as fh:
+        h.update(fh.read(sample))
+    return h.hexdigest()
+
+
+def _read_csv(src) -> pd.DataFrame:
+    df = pd.read_csv(src)
+    return df.astype({c: t for c, t in CSV_DTYPES.items() if c in df.columns})
+
+
+def read_table(path: str, columnar: bool = True) -> pd.DataFrame:
+    """Lê o CSV via sidecar Parquet tipado, convertendo-o na primeira leitura.
+
+    O sidecar fica em ``<pasta do CSV>/.columnar/<nome>.<chave>.parquet``; se o
+    CSV mudar (tamanho/mtime/conteúdo) a chave muda e ele é regenerado.
+    Sem ``pyarrow`` ou sem permissão de escrita, cai para ``pd.read_csv``.
+    """
+    if not columnar:
+        return _read_csv(path)
+    try:
+        import pyarrow  # noqa: F401  (dependência opcional)
+    except ImportError:
+        return _read_csv(path)
+
+    folder, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    cache_dir = os.path.join(folder, COLUMNAR_DIR)
+    sidecar = os.path.join(cache_dir, f"{stem}.{fingerprint(path)}.parquet")
+
+    if os.path.exists(sidecar):
+        return pd.read_parquet(sidecar)
+
+    df = _read_csv(path)
+    tmp = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, sidecar)   # troca atômica: leitores nunca veem arquivo parcial
+        stale = re.compile(re.escape(stem) + r"\.[0-9a-f]{16}\.parquet")   # só sidecars deste CSV
+        for old in os.listdir(cache_dir):
+            if stale.fullmatch(old) and old != os.path.basename(sidecar):
+                os.remove(os.path.join(cache_dir, old))
+    except Exception:
+        if os.path.exists(tmp): os.remove(tmp)
+    return df
+
+
+def dataset_path(local_path: str = None,
+                 fallback_kaggle: str = None,
+                 fallback_filename: str | None = None) -> str | None:
+    """Caminho do CSV (local > mirror offline); ``None`` se nenhum estiver disponível.
+
+    Nunca acessa a rede: o KaggleHub (``fallback_kaggle``) só alimenta o mirror
+    via ``python -m src.sources prefetch``.
+    """
+    from src.sources import DatasetRef, SourceUnavailable, local_sources, resolve
+
+    filename = fallback_filename or (os.path.basename(local_path) if local_path else None)
+    if filename is None:
+        return None
+    try:
+        return resolve(DatasetRef(filename, kaggle=fallback_kaggle), local_sources(local_path))
+    except SourceUnavailable as e:
+        logging.getLogger(__name__).warning("%s (rode `python -m src.sources prefetch`)", e)
+        return None
 
 
 def clean_diabetes(df: pd.DataFrame) -> pd.DataFrame:
     cols = ["Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI"]
-    return df.assign(**{c: df[c].replace(0, pd.NA) for c in cols})
+    # Zero = ausente; ``where`` mantém a coluna numérica (NaN), sem cair para object
+    return df.assign(**{c: df[c].where(df[c] != 0) for c in cols})
+
+
+# Faixas das classificações derivadas: coluna -> (nova coluna, bins, rótulos)
+DERIVED_BINS = {
+    "Age": ("Age_Group", [0, 30, 45, 60, 100], ["18-30", "31-45", "46-60", "60+"]),
+    "BMI": ("BMI_Category", [0, 18.5, 25, 30, float("inf")],
+            ["Baixo peso", "Normal", "Sobrepeso", "Obesidade"]),
+    "Glucose": ("Glucose_Level", [0, 100, 126, float("inf")],
+                ["Normal", "Pré-diabetes", "Diabetes"]),
+}
+
+
+# Um único CategoricalDtype por classificação, compartilhado por todos os frames
+CATEGORY_DTYPES = {name: pd.CategoricalDtype(labels, ordered=True)
+                   for name, _, labels in DERIVED_BINS.values()}
+
+
+def derive_columns(df: pd.DataFrame, medians: dict | None = None,
+                   rules=DEFAULT_RULES) -> pd.DataFrame:
+    """Adiciona Age_Group, BMI_Category, Glucose_Level e Risk_Score.
+
+    Valores ausentes são classificados pela mediana; ``medians`` permite usar a
+    mediana do dataset inteiro quando ``df`` é apenas um bloco dele. O score
+    segue a tabela ``rules`` (ver ``src.risk``).
+    """
+    medians = medians or {}
+    out = {}
+    for col, (name, bins, labels) in DERIVED_BINS.items():
+        median = medians.get(col, df[col].median())
+        # float64 explícito: pd.cut sobre object com NA classifica errado após o NA
+        values = pd.Series(df[col].to_numpy("float64", na_value=float("nan")), index=df.index)
+        out[name] = pd.cut(values.fillna(median), bins=bins, labels=labels) \
+            .astype(CATEGORY_DTYPES[name])
+
+    # Risk Score pela tabela de regras (NaN nunca pontua)
+    out["Risk_Score"] = risk_score(df, rules)
+    return df.assign(**out)
+
+
+# Esquema compacto do cohort preparado (inteiros com NA viram Int8/Int16 nullable)
+COMPACT_DTYPES = {
+    "Pregnancies": "int8",
+    "Age": "int8",
+    "Outcome": "int8",
+    "Risk_Score": "int16",
+    "Glucose": "float32",
+    "BloodPressure": "float32",
+    "SkinThickness": "float32",
+    "Insulin": "float32",
+    "BMI": "float32",
+    "DiabetesPedigreeFunction": "float32",
+}
+
+
+# Versão do preparo do cohort (faixas, esquema compacto, regras padrão), parte da
+# chave de caches que sobrevivem ao processo (``src.shared``). Incremente
+# ``PIPELINE_REVISION`` ao mudar o código de ``clean_diabetes``/``derive_columns``.
+PIPELINE_REVISION = 2
+PIPELINE_VERSION = hashlib.blake2b(repr((
+    PIPELINE_REVISION, DERIVED_BINS, COMPACT_DTYPES, CATEGORY_DTYPES, DEFAULT_RULES,
+)).encode(), digest_size=4).hexdigest()
+
+
+class MemoryReport(NamedTuple):
+    before: int   # bytes (memory_usage deep)
+    after: int
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+    @property
+    def ratio(self) -> float:
+        return self.saved / self.before if self.before else 0.0
+
+
+def compact_dtypes(df: pd.DataFrame) -> tuple[pd.DataFrame, MemoryReport]:
+    """Converte o cohort para o esquema compacto e mede os bytes economizados."""
+    before = int(df.memory_usage(deep=True).sum())
+    out = {}
+    for col, dtype in COMPACT_DTYPES.items():
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col]) if df[col].dtype == object else df[col]
+        if dtype.startswith("int") and values.isna().any():
+            dtype = dtype.capitalize()   # máscara nullable em vez de object/float
+        out[col] = values.astype(dtype)
+    for col, dtype in CATEGORY_DTYPES.items():
+        if col in df.columns:
+            out[col] = df[col].astype(dtype)
+    df = df.assign(**out)
+    return df, MemoryReport(before, int(df.memory_usage(deep=True).sum()))
 
 
 def protein_percentage(df: pd.DataFrame) -> pd.DataFrame: